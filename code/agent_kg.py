@@ -1,19 +1,43 @@
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from neo4j.exceptions import TransientError
+import argparse
+import asyncio
+import itertools
+import logging
+import math
+import random
 import re
-from striprtf.striprtf import rtf_to_text
+import time
+from metrics import METRICS
+from tuple_sources import iter_entries, parse_entry
+from config import (NEO4J_ACQUISITION_TIMEOUT, NEO4J_CONNECTION_TIMEOUT, NEO4J_MAX_POOL_SIZE, NEO4J_MAX_RETRY_TIME,
+                    NEO4J_PASSWORD, NEO4J_URI, NEO4J_USER)
 
-# Connect to the Neo4j database
-driver = GraphDatabase.driver("bolt://localhost:7687", auth=("neo4j", "eklil@2017"))
+def driver_settings(**overrides):
+    settings = dict(
+        uri=NEO4J_URI,
+        auth=(NEO4J_USER, NEO4J_PASSWORD),
+        max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+        connection_timeout=NEO4J_CONNECTION_TIMEOUT,
+        connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+        max_transaction_retry_time=NEO4J_MAX_RETRY_TIME,
+    )
+    settings.update(overrides)
+    return settings
 
-# Function to read RTF file
-def read_rtf_file(file_path):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    return rtf_to_text(content)
+def create_driver(**overrides):
+    """A pooled driver configured from config.py (URI, credentials, pool size, timeouts); keyword arguments override it."""
+    settings = driver_settings(**overrides)
+    return GraphDatabase.driver(settings.pop("uri"), **settings)
 
-# Function to parse the content of RTF file
-def parse_rtf_content(content):
-    return [line.strip() for line in content.split('\n') if line.strip()]
+# Connect to the Neo4j database on first use, so importing this module never opens a connection
+driver = None
+
+def get_driver():
+    global driver
+    if driver is None:
+        driver = create_driver()
+    return driver
 
 def create_material_nodes(tx):
     materials = ["Concrete", "Steel", "Wood", "Bricks"]
@@ -30,269 +54,630 @@ def create_deterioration_nodes(tx, material, deterioration, physical_change, ndt
            "MERGE (p)-[:DETECTED_BY]->(n)",
            material=material, deterioration=deterioration, physical_change=physical_change, ndt_method=ndt_method)
 
-def load_data():
-    with driver.session() as session:
+# Tuples per transaction when loading in batches
+DEFAULT_BATCH_SIZE = 1000
+
+# The same MERGEs as create_deterioration_nodes, for a whole batch of tuples in one statement
+CREATE_DETERIORATION_BATCH = (
+    "UNWIND $rows AS row "
+    "MERGE (m:Material {name: row.material}) "
+    "MERGE (d:DeteriorationMechanism {name: row.deterioration}) "
+    "MERGE (p:PhysicalChange {name: row.physical_change}) "
+    "MERGE (n:NDTMethod {name: row.ndt_method}) "
+    "MERGE (m)-[:HAS_DETERIORATION_MECHANISM]->(d) "
+    "MERGE (d)-[:CAUSES_PHYSICAL_CHANGE]->(p) "
+    "MERGE (p)-[:DETECTED_BY]->(n)"
+)
+
+def create_deterioration_batch(tx, rows):
+    tx.run(CREATE_DETERIORATION_BATCH, rows=rows)
+
+def iter_batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_rows(entries):
+    """Yield the rows of the well-formed tuples, lazily, counting the malformed ones."""
+    for entry in entries:
+        row = parse_entry(entry)
+        if row is None:
+            METRICS.inc("graph_tuples_rejected")
+            logging.debug(f"Skipping malformed tuple: {entry}")
+        else:
+            yield row
+
+def write_entries(session, entries, batch_size=DEFAULT_BATCH_SIZE):
+    """Write the tuples with one UNWIND statement (and one transaction) per batch of batch_size.
+
+    entries may be a generator; only one batch is held in memory at a time.
+    """
+    for i, batch in enumerate(iter_batches(iter_rows(entries), batch_size), 1):
+        started = time.monotonic()
+        session.execute_write(create_deterioration_batch, batch)
+        elapsed = time.monotonic() - started
+        METRICS.observe("graph_batch", elapsed)
+        METRICS.inc("graph_batches")
+        METRICS.inc("graph_tuples_written", len(batch))
+        logging.info(f"Batch {i}: {len(batch)} tuples in {elapsed:.3f}s")
+
+def tune_batch_size(session, entries, candidates=(100, 500, 1000, 2000, 5000)):
+    """Write entries once per candidate batch size and return the fastest size (MERGE makes the rewrites no-ops).
+
+    Use a representative sample: the first pass also creates the nodes, so it is repeated before timing.
+    """
+    entries = list(entries)
+    write_entries(session, entries, max(candidates))
+    timings = {}
+    for batch_size in candidates:
+        started = time.monotonic()
+        write_entries(session, entries, batch_size)
+        timings[batch_size] = time.monotonic() - started
+        logging.info(f"Batch size {batch_size}: {len(entries) / timings[batch_size]:.0f} tuples/s")
+    return min(timings, key=timings.get)
+
+# Every node the loaders MERGE is matched on name; add new node labels here
+NODE_LABELS = ("Material", "DeteriorationMechanism", "PhysicalChange", "NDTMethod")
+
+def constraint_name(label):
+    return f"{label.lower()}_name_unique"
+
+def graph_labels(session):
+    return [record["label"] for record in session.run("CALL db.labels() YIELD label RETURN label")]
+
+def unique_name_labels(session):
+    labels = set()
+    for record in session.run("SHOW CONSTRAINTS YIELD labelsOrTypes, properties, type"):
+        if "UNIQUENESS" in record["type"] and record["properties"] == ["name"]:
+            labels.update(record["labelsOrTypes"])
+    return labels
+
+def ensure_schema(session, labels=None):
+    """Create a uniqueness constraint on name (and with it an index) for every node label, and wait until they are online.
+
+    Idempotent; labels defaults to NODE_LABELS plus any other label already in the graph. Raises
+    RuntimeError if a constraint is missing afterwards.
+    """
+    labels = sorted(set(NODE_LABELS) | set(graph_labels(session))) if labels is None else labels
+    for label in labels:
+        session.run(f"CREATE CONSTRAINT {constraint_name(label)} IF NOT EXISTS FOR (n:`{label}`) REQUIRE n.name IS UNIQUE")
+    session.run("CALL db.awaitIndexes(300)")
+    constrained = unique_name_labels(session)
+    missing = [label for label in labels if label not in constrained]
+    if missing:
+        raise RuntimeError(f"Uniqueness constraints missing for: {', '.join(missing)}")
+    logging.info(f"Schema ready: unique name on {', '.join(labels)}")
+    return labels
+
+def drop_schema(session, labels=NODE_LABELS):
+    for label in labels:
+        session.run(f"DROP CONSTRAINT {constraint_name(label)} IF EXISTS")
+
+def compare_schema_load_times(load):
+    """Run load into an empty graph without and then with the constraints, and return both timings in seconds."""
+    timings = {}
+    for with_schema in (False, True):
+        with get_driver().session() as session:
+            session.run("MATCH (n) DETACH DELETE n")
+            if with_schema:
+                ensure_schema(session)
+            else:
+                drop_schema(session)
+        started = time.monotonic()
+        load()
+        timings["with_constraints" if with_schema else "without_constraints"] = time.monotonic() - started
+    logging.info(f"Load time without constraints {timings['without_constraints']:.2f}s, "
+                 f"with constraints {timings['with_constraints']:.2f}s")
+    return timings
+
+# Load "Material; mechanism; physical change; NDT method" strings, e.g. freshly extracted tuples
+_schema_ready = False
+
+def load_entries(entries, batch_size=DEFAULT_BATCH_SIZE):
+    global _schema_ready
+    with get_driver().session() as session:
+        if not _schema_ready:
+            ensure_schema(session, NODE_LABELS)
+            _schema_ready = True
+        write_entries(session, entries, batch_size)
+
+async def _write_batch_async(tx, query, parameters):
+    result = await tx.run(query, **parameters)
+    await result.consume()
+
+async def _write_batch_with_retries(session, query, parameters, max_attempts=5):
+    for attempt in range(max_attempts):
+        try:
+            return await session.execute_write(_write_batch_async, query, parameters)
+        except TransientError as error:
+            # execute_write has already retried for max_transaction_retry_time; back off and give it another go
+            if attempt == max_attempts - 1:
+                raise
+            delay = random.uniform(0, 0.5 * 2 ** attempt)
+            METRICS.inc("graph_transient_retries")
+            logging.warning(f"Transient error writing a batch ({error.code}); retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+def partition_pairs(pairs, batch_size):
+    """Split (start name, end name) pairs into work units that share no node with each other.
+
+    Pairs joined by a common start or end node form a connected component, and every unit is made
+    of whole components, so transactions from different units never lock the same node. Small
+    components are packed together into one batch; a component larger than batch_size becomes a
+    unit of several batches, to be written one after another. Returns a list of units (lists of batches).
+    """
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for start, end in pairs:
+        parent[find(("start", start))] = find(("end", end))
+    components = {}
+    for pair in sorted(pairs):
+        components.setdefault(find(("start", pair[0])), []).append(list(pair))
+
+    units = []
+    packed = []
+    for component in components.values():
+        if len(component) >= batch_size:
+            units.append(list(iter_batches(component, batch_size)))
+            continue
+        if len(packed) + len(component) > batch_size:
+            units.append([packed])
+            packed = []
+        packed.extend(component)
+    if packed:
+        units.append([packed])
+    return units
+
+def spread_batch_size(count, workers, batch_size):
+    """The batch size that gives every worker at least one batch of count items, capped at batch_size."""
+    return min(batch_size, max(1, math.ceil(count / workers)))
+
+async def async_write_entries(entries, workers=4, batch_size=DEFAULT_BATCH_SIZE, **driver_overrides):
+    """Write the tuples in UNWIND batches from workers concurrent sessions of one pooled async driver.
+
+    All nodes are MERGEd first, label by label, in batches of distinct names, so concurrent node
+    batches never lock the same node. Each relationship type is then written in units from
+    partition_pairs, which share no start or end node and so cannot deadlock. Densely connected
+    data may form fewer independent units than workers; the relationships are then split into
+    plain batches written concurrently instead, and the deadlocks this can cause are retried and
+    counted in graph_transient_retries. The concurrency achieved in each phase is logged. entries
+    may be a generator; only the distinct nodes and relationships are kept, so memory grows with
+    the size of the graph, not of the input.
+    """
+    relationships, nodes = desired_graph(entries)
+    retries_before = METRICS.counters.get("graph_transient_retries", 0)
+    achieved = {}
+
+    settings = driver_settings(**driver_overrides)
+    settings["max_connection_pool_size"] = max(settings["max_connection_pool_size"], workers)
+    async with AsyncGraphDatabase.driver(settings.pop("uri"), **settings) as async_driver:
+        async def write_units(phase, query, key, units):
+            queue = asyncio.Queue()
+            for unit in units:
+                queue.put_nowait(unit)
+
+            async def worker():
+                async with async_driver.session() as session:
+                    while not queue.empty():
+                        for batch in queue.get_nowait():
+                            started = time.monotonic()
+                            await _write_batch_with_retries(session, query, {key: batch})
+                            METRICS.observe("graph_batch", time.monotonic() - started)
+                            METRICS.inc("graph_batches")
+
+            achieved[phase] = min(workers, len(units))
+            await asyncio.gather(*(worker() for _ in range(achieved[phase])))
+
+        started = time.monotonic()
+        for label in NODE_LABELS:
+            names = sorted(nodes[label])
+            units = [[batch] for batch in iter_batches(names, spread_batch_size(len(names), workers, batch_size))]
+            await write_units(label, f"UNWIND $names AS name MERGE (:{label} {{name: name}})", "names", units)
+            METRICS.inc("graph_nodes_written", len(names))
+        for start_label, _, rel_type, end_label, _ in RELATIONSHIPS:
+            pairs = relationships[rel_type]
+            units = partition_pairs(pairs, batch_size)
+            if len(units) < workers and len(pairs) > len(units):
+                logging.info(f"{rel_type}: only {len(units)} independent units for {workers} workers; "
+                             f"writing plain batches concurrently and retrying deadlocks")
+                ordered = sorted(list(pair) for pair in pairs)
+                units = [[batch] for batch in iter_batches(ordered, spread_batch_size(len(ordered), workers, batch_size))]
+            else:
+                logging.info(f"{rel_type}: {len(pairs)} relationships in {len(units)} independent units")
+            await write_units(rel_type, f"UNWIND $pairs AS pair MATCH (a:{start_label} {{name: pair[0]}}) "
+                                        f"MATCH (b:{end_label} {{name: pair[1]}}) MERGE (a)-[:{rel_type}]->(b)", "pairs", units)
+            METRICS.inc("graph_relationships_written", len(pairs))
+    retries = METRICS.counters.get("graph_transient_retries", 0) - retries_before
+    logging.info(f"Wrote {sum(len(names) for names in nodes.values())} nodes and "
+                 f"{sum(len(pairs) for pairs in relationships.values())} relationships in {time.monotonic() - started:.2f}s; "
+                 f"concurrent sessions per phase (of {workers}): {achieved}; {retries} transient errors retried")
+
+def load_entries_concurrently(entries, workers=4, batch_size=DEFAULT_BATCH_SIZE, **driver_overrides):
+    return asyncio.run(async_write_entries(entries, workers, batch_size, **driver_overrides))
+
+# (start label, start field, relationship type, end label, end field) of every relationship a tuple creates
+RELATIONSHIPS = (
+    ("Material", "material", "HAS_DETERIORATION_MECHANISM", "DeteriorationMechanism", "deterioration"),
+    ("DeteriorationMechanism", "deterioration", "CAUSES_PHYSICAL_CHANGE", "PhysicalChange", "physical_change"),
+    ("PhysicalChange", "physical_change", "DETECTED_BY", "NDTMethod", "ndt_method"),
+)
+
+def desired_graph(entries):
+    """Return ({rel type: set of (start name, end name)}, {label: set of names}) that the tuples describe.
+
+    Only distinct relationships are kept, so memory grows with the size of the graph, not of the input.
+    """
+    relationships = {rel_type: set() for _, _, rel_type, _, _ in RELATIONSHIPS}
+    nodes = {label: set() for label in NODE_LABELS}
+    for row in iter_rows(entries):
+        for start_label, start_field, rel_type, end_label, end_field in RELATIONSHIPS:
+            relationships[rel_type].add((row[start_field], row[end_field]))
+            nodes[start_label].add(row[start_field])
+            nodes[end_label].add(row[end_field])
+    return relationships, nodes
+
+def current_relationships(session):
+    relationships = {}
+    for start_label, _, rel_type, end_label, _ in RELATIONSHIPS:
+        result = session.run(f"MATCH (a:{start_label})-[:{rel_type}]->(b:{end_label}) RETURN a.name AS start, b.name AS end")
+        relationships[rel_type] = {(record["start"], record["end"]) for record in result}
+    return relationships
+
+def _run_batches(session, query, pairs, batch_size):
+    for batch in iter_batches(sorted(pairs), batch_size):
+        session.execute_write(lambda tx: tx.run(query, pairs=[list(pair) for pair in batch]).consume())
+
+def _delete_orphans(session, label, keep, batch_size):
+    """Delete nodes of label that have no relationships and are not in keep, batch_size per transaction."""
+    query = (f"MATCH (n:{label}) WHERE NOT (n)--() AND NOT n.name IN $keep "
+             "WITH n LIMIT $limit DELETE n RETURN count(n) AS deleted")
+    total = 0
+    while True:
+        deleted = session.execute_write(lambda tx: tx.run(query, keep=list(keep), limit=batch_size).single()["deleted"])
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+def sync_graph(entries, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """Make the graph match the tuples by applying only the difference, instead of wiping and reloading.
+
+    Relationships the tuples no longer describe are deleted, new ones are merged, and nodes left
+    without any relationship are removed, each in transactions of at most batch_size changes so no
+    transaction grows with the size of the graph. Returns the number of changes per kind.
+    """
+    desired, nodes = desired_graph(entries)
+    summary = {"added": 0, "removed": 0, "orphans_deleted": 0}
+    with get_driver().session() as session:
+        if not dry_run:
+            ensure_schema(session, NODE_LABELS)
+        current = current_relationships(session)
+        for start_label, _, rel_type, end_label, _ in RELATIONSHIPS:
+            added = desired[rel_type] - current[rel_type]
+            removed = current[rel_type] - desired[rel_type]
+            summary["added"] += len(added)
+            summary["removed"] += len(removed)
+            logging.info(f"{rel_type}: {len(added)} to add, {len(removed)} to remove")
+            if dry_run:
+                continue
+            _run_batches(session, f"UNWIND $pairs AS pair MATCH (a:{start_label} {{name: pair[0]}})-[r:{rel_type}]->"
+                                  f"(b:{end_label} {{name: pair[1]}}) DELETE r", removed, batch_size)
+            _run_batches(session, f"UNWIND $pairs AS pair MERGE (a:{start_label} {{name: pair[0]}}) "
+                                  f"MERGE (b:{end_label} {{name: pair[1]}}) MERGE (a)-[:{rel_type}]->(b)", added, batch_size)
+        if not dry_run:
+            for label in NODE_LABELS:
+                summary["orphans_deleted"] += _delete_orphans(session, label, nodes[label], batch_size)
+    METRICS.inc("graph_relationships_added", summary["added"])
+    METRICS.inc("graph_relationships_removed", summary["removed"])
+    logging.info(f"Graph sync{' (dry run)' if dry_run else ''}: {summary}")
+    return summary
+
+def builtin_entries():
+    """The tuples loaded when no extraction output is given."""
+    # Load and parse data for each material
+    materials_data = {
+        'Concrete': [
+            "Concrete; corrosion; cracking; visual inspection",
+            "Concrete; corrosion; spalling; ultrasonic testing",
+            "Concrete; corrosion; discoloration; infrared thermography",
+            "Concrete; freeze-thaw cycles; cracking; visual inspection",
+            "Concrete; freeze-thaw cycles; spalling; ultrasonic testing",
+            "Concrete; freeze-thaw cycles; discoloration; infrared thermography",
+            "Concrete; chemical attack; cracking; visual inspection",
+            "Concrete; chemical attack; spalling; ultrasonic testing",
+            "Concrete; chemical attack; discoloration; infrared thermography",
+            "Concrete; changes in microstructure; cracking; visual inspection",
+            "Concrete; changes in microstructure; spalling; ultrasonic testing",
+            "Concrete; changes in microstructure; discoloration; infrared thermography",
+            "Concrete; changes in mechanical properties; cracking; visual inspection",
+            "Concrete; changes in mechanical properties; spalling; ultrasonic testing",
+            "Concrete; changes in mechanical properties; discoloration; infrared thermography",
+            "Concrete; dimensional changes; cracking; visual inspection",
+            "Concrete; dimensional changes; spalling; ultrasonic testing",
+            "Concrete; dimensional changes; discoloration; infrared thermography",
+            "Concrete; corrosion; cracking; half-cell potential measurement",
+            "Concrete; corrosion; spalling; half-cell potential measurement",
+            "Concrete; corrosion; discoloration; half-cell potential measurement",
+            "Concrete; freeze-thaw cycles; cracking; ultrasonic pulse velocity",
+            "Concrete; freeze-thaw cycles; spalling; ultrasonic pulse velocity",
+            "Concrete; freeze-thaw cycles; discoloration; ultrasonic pulse velocity",
+            "Concrete; chemical attack; cracking; permeation test",
+            "Concrete; chemical attack; spalling; permeation test",
+            "Concrete; chemical attack; discoloration; permeation test",
+            "Concrete; extreme temperature changes; cracking; resonant frequency methods",
+            "Concrete; extreme temperature changes; spalling; resonant frequency methods",
+            "Concrete; extreme temperature changes; discoloration; resonant frequency methods",
+            "Concrete; mechanical loading; cracking; impact-echo method",
+            "Concrete; mechanical loading; spalling; impact-echo method",
+            "Concrete; mechanical loading; voids; impact-echo method",
+            "Concrete; mechanical loading; delamination; impact-echo method",
+            "Concrete; moisture ingress; cracking; chloride-ion permeability test",
+            "Concrete; moisture ingress; spalling; chloride-ion permeability test",
+            "Concrete; moisture ingress; discoloration; chloride-ion permeability test",
+            "Concrete; corrosion; cracking; half-cell potential test",
+            "Concrete; corrosion; spalling; half-cell potential test",
+            "Concrete; freeze-thaw cycles; cracking; visual inspection",
+            "Concrete; freeze-thaw cycles; spalling; visual inspection",
+            "Concrete; chemical attack; discoloration; visual inspection",
+            "Concrete; chemical attack; cracking; ultrasonic testing",
+            "Concrete; carbonation; cracking; ultrasonic testing",
+            "Concrete; carbonation; spalling; infrared thermography",
+            "Concrete; chloride ion content; cracking; infrared thermography",
+            "Concrete; chloride ion content; spalling; acoustic techniques",
+            "Concrete; changes in microstructure; cracking; acoustic techniques",
+            "Concrete; changes in microstructure; spalling; rebound hammer",
+            "Concrete; changes in mechanical properties; cracking; pullout test",
+            "Concrete; changes in mechanical properties; spalling; pull-off test",
+            "Concrete; dimensional changes; cracking; penetration resistance methods",
+            "Concrete; dimensional changes; spalling; ultrasonic pulse velocity method",
+        ],
+        'Steel': [
+            "Steel; corrosion; thinning; ultrasonic testing",
+            "Steel; corrosion; pitting; eddy current testing",
+            "Steel; fatigue; cracking; radiographic testing",
+            "Steel; stress corrosion cracking; cracking; eddy current testing",
+            "Steel; corrosion; changes in microstructure; visual testing",
+            "Steel; fatigue; changes in mechanical properties; eddy current testing",
+            "Steel; stress corrosion cracking; dimensional changes; acoustic emission",
+            "Steel; corrosion; pitting; ultrasonic testing",
+            "Steel; corrosion; cracking; ultrasonic testing",
+            "Steel; fatigue; cracking; eddy current testing",
+            "Steel; corrosion; thinning; eddy current testing",
+            "Steel; corrosion; cracking; eddy current testing",
+            "Steel; fatigue; cracking; acoustic emission",
+            "Steel; stress corrosion cracking; cracking; acoustic emission",
+            "Steel; corrosion; thinning; x-radiography",
+            "Steel; corrosion; pitting; x-radiography",
+            "Steel; corrosion; cracking; x-radiography",
+            "Steel; fatigue; cracking; x-radiography",
+            "Steel; stress corrosion cracking; cracking; x-radiography",
+            "Steel; corrosion; thinning; laser-based technique",
+            "Steel; corrosion; pitting; laser-based technique",
+            "Steel; corrosion; cracking; laser-based technique",
+            "Steel; fatigue; cracking; laser-based technique",
+            "Steel; stress corrosion cracking; cracking; laser-based technique",
+            "Steel; stress corrosion cracking; cracking; visual testing",
+            "Steel; residual stresses; changes in mechanical properties; ultrasonic critical refracted longitudinal waves",
+            "Steel; fatigue; cracking; guided ultrasonic wave procedure",
+            "Steel; corrosion; thinning; radiographic testing",
+            "Steel; corrosion; thinning; acoustic emissions",
+            "Steel; fatigue; cracking; ultrasonic testing",
+            "Steel; fatigue; cracking; acoustic emissions",
+            "Steel; stress corrosion cracking; cracking; radiographic testing",
+            "Steel; stress corrosion cracking; cracking; ultrasonic testing",
+            "Steel; stress corrosion cracking; cracking; acoustic emissions",
+            "Steel; corrosion; pitting; radiographic testing",
+            "Steel; corrosion; pitting; acoustic emissions",
+            "Steel; fatigue; changes in microstructure; radiographic testing",
+            "Steel; fatigue; changes in microstructure; ultrasonic testing",
+            "Steel; fatigue; changes in microstructure; eddy current testing",
+            "Steel; fatigue; changes in microstructure; acoustic emissions",
+            "Steel; stress corrosion cracking; changes in microstructure; radiographic testing",
+            "Steel; stress corrosion cracking; changes in microstructure; ultrasonic testing",
+            "Steel; stress corrosion cracking; changes in microstructure; eddy current testing",
+            "Steel; stress corrosion cracking; changes in microstructure; acoustic emissions",
+            "Steel; corrosion; changes in mechanical properties; radiographic testing",
+            "Steel; corrosion; changes in mechanical properties; ultrasonic testing",
+            "Steel; corrosion; changes in mechanical properties; eddy current testing",
+            "Steel; corrosion; changes in mechanical properties; acoustic emissions",
+            "Steel; fatigue; changes in mechanical properties; radiographic testing",
+            "Steel; fatigue; changes in mechanical properties; ultrasonic testing",
+            "Steel; fatigue; changes in mechanical properties; acoustic emissions",
+            "Steel; stress corrosion cracking; changes in mechanical properties; radiographic testing",
+            "Steel; stress corrosion cracking; changes in mechanical properties; ultrasonic testing",
+            "Steel; stress corrosion cracking; changes in mechanical properties; eddy current testing",
+            "Steel; stress corrosion cracking; changes in mechanical properties; acoustic emissions",
+            "Steel; corrosion; dimensional changes; radiographic testing",
+            "Steel; corrosion; dimensional changes; ultrasonic testing",
+            "Steel; corrosion; dimensional changes; eddy current testing",
+            "Steel; corrosion; dimensional changes; acoustic emissions",
+            "Steel; fatigue; dimensional changes; radiographic testing",
+            "Steel; fatigue; dimensional changes; ultrasonic testing",
+            "Steel; fatigue; dimensional changes; eddy current testing",
+            "Steel; fatigue; dimensional changes; acoustic emissions",
+            "Steel; stress corrosion cracking; dimensional changes; radiographic testing",
+            "Steel; stress corrosion cracking; dimensional changes; ultrasonic testing",
+            "Steel; stress corrosion cracking; dimensional changes; eddy current testing",
+            "Steel; stress corrosion cracking; dimensional changes; acoustic emissions",
+            "Steel; corrosion; pitting; radiographic inspection",
+            "Steel; fatigue; dimensional changes; acoustic emission",
+            "Steel; corrosion; changes in mechanical properties; radiographic inspection",
+            "Steel; fatigue; changes in mechanical properties; acoustic emission",
+            "Steel; corrosion; changes in microstructure; radiographic inspection",
+            "Steel; fatigue; pitting; acoustic emission",
+            "Steel; fatigue; changes in mechanical properties; acoustic emission testing",
+            "Steel; corrosion; changes in microstructure; eddy current testing",
+            "Steel; fatigue; changes in microstructure; x-ray diffraction analysis",
+            "Steel; fatigue; dimensional changes; acoustic emission testing",
+            "Steel; corrosion; changes in microstructure; ultrasonic testing",
+        ],
+        'Wood': [
+            "Wood; fungal decay; changes in structure geometry; visual inspection",
+            "Wood; fungal decay; changes in material macro- & microstructure; ultrasonic testing",
+            "Wood; insect attack; discontinuity of material; visual inspection",
+            "Wood; insect attack; changes in structure geometry; ultrasonic testing",
+            "Wood; UV exposure; surface roughness; visual inspection",
+            "Wood; UV exposure; erosion of early-wood; visual inspection",
+            "Wood; mechanical wear; crack formation; visual inspection",
+            "Wood; mechanical wear; delamination; visual inspection",
+            "Wood; moisture changes; crack formation; visual inspection",
+            "Wood; moisture changes; delamination; visual inspection",
+            "Wood; mechanical long-term load; changes in mechanical parameters; visual inspection",
+            "Wood; mechanical long-term load; changes in structure geometry; visual inspection",
+            "Wood; fungal decay; changes in density; electrical resistance",
+            "Wood; fungal decay; changes in material macro- & microstructure; computed tomography",
+            "Wood; insect attack; discontinuity of material; acoustic emission",
+            "Wood; insect attack; changes in structure geometry; computed tomography",
+            "Wood; insect attack; changes in material macro- & microstructure; X-ray imaging",
+            "Wood; insect attack; changes in mechanical parameters; acoustic emission",
+            "Wood; insect attack; changes in structure geometry; acoustic emission",
+            "Wood; insect attack; changes in material macro- & microstructure; drilling resistance",
+            "Wood; insect attack; changes in mechanical parameters; eigenfrequency measurements",
+            "Wood; insect attack; changes in structure geometry; video image correlation",
+            "Wood; insect attack; changes in material macro- & microstructure; thermography",
+            "Wood; insect attack; changes in chemical constitution; chemical analyses using spectroscopy",
+            "Wood; insect attack; changes in structure geometry; visual inspection",
+            "Wood; insect attack; changes in material macro- & microstructure; classical microscopic methods",
+            "Wood; insect attack; changes in structure geometry; strain measurements",
+            "Wood; insect attack; changes in material macro- & microstructure; colour measurements",
+            "Wood; insect attack; changes in structure geometry; delamination surveys",
+            "Wood; insect attack; changes in material macro- & microstructure; computed tomography",
+            "Wood; fungal decay; changes in structure geometry; X-ray/synchrotron",
+            "Wood; fungal decay; changes in material macro- & microstructure; X-ray/synchrotron",
+            "Wood; fungal decay; mechanical parameters; X-ray/synchrotron",
+            "Wood; fungal decay; discontinuity of material; X-ray/synchrotron",
+            "Wood; fungal decay; water & gas resistance; X-ray/synchrotron",
+            "Wood; fungal decay; chemical constitution; X-ray/synchrotron",
+            "Wood; oxidation; changes in structure geometry; Colour measurement/gloss level",
+            "Wood; oxidation; changes in material macro- & microstructure; Colour measurement/gloss level",
+            "Wood; oxidation; mechanical parameters; Colour measurement/gloss level",
+            "Wood; oxidation; discontinuity of material; Colour measurement/gloss level",
+            "Wood; oxidation; water & gas resistance; Colour measurement/gloss level",
+            "Wood; oxidation; chemical constitution; Colour measurement/gloss level",
+            "Wood; mechanical load; changes in structure geometry; Optical imaging methods (video image correlation)",
+            "Wood; mechanical load; changes in material macro- & microstructure; Optical imaging methods (video image correlation)",
+            "Wood; mechanical load; mechanical parameters; Optical imaging methods (video image correlation)",
+            "Wood; mechanical load; discontinuity of material; Optical imaging methods (video image correlation)",
+            "Wood; mechanical load; water & gas resistance; Optical imaging methods (video image correlation)",
+            "Wood; mechanical load; chemical constitution; Optical imaging methods (video image correlation)",
+            "Wood; moisture content; changes in structure geometry; Moisture measurement",
+            "Wood; moisture content; changes in material macro- & microstructure; Moisture measurement",
+            "Wood; moisture content; mechanical parameters; Moisture measurement",
+            "Wood; moisture content; discontinuity of material; Moisture measurement",
+            "Wood; moisture content; water & gas resistance; Moisture measurement",
+            "Wood; moisture content; chemical constitution; Moisture measurement",
+            "Wood; rot; changes in structure geometry; Electric resistance measurements",
+            "Wood; rot; changes in material macro- & microstructure; Electric resistance measurements",
+            "Wood; rot; mechanical parameters; Electric resistance measurements",
+            "Wood; rot; discontinuity of material; Electric resistance measurements",
+            "Wood; rot; water & gas resistance; Electric resistance measurements",
+            "Wood; rot; chemical constitution; Electric resistance measurements",
+            "Wood; knots; changes in structure geometry; Thermography",
+            "Wood; knots; changes in material macro- & microstructure; Thermography",
+            "Wood; knots; mechanical parameters; Thermography",
+            "Wood; knots; discontinuity of material; Thermography",
+            "Wood; knots; water & gas resistance; Thermography",
+            "Wood; knots; chemical constitution; Thermography",
+            "Wood; delamination; changes in structure geometry; Thermography",
+            "Wood; delamination; changes in material macro- & microstructure; Thermography",
+            "Wood; delamination; mechanical parameters; Thermography",
+            "Wood; delamination; discontinuity of material; Thermography",
+            "Wood; delamination; water & gas resistance; Thermography",
+            "Wood; delamination; chemical constitution; Thermography",
+            "Wood; fungal decay; mechanical parameters; thermography",
+            "Wood; insect attack; discontinuity of material; radiography",
+            "Wood; insect attack; water & gas resistance; neutron imaging",
+            "Wood; UV exposure; chemical constitution; near-infrared spectroscopy",
+        ],
+        'Bricks': [
+            "Bricks; salt crystallization; spalling; ultrasonic testing",
+            "Bricks; weathering; cracking; visual inspection",
+            "Bricks; weathering; spalling; visual inspection",
+            "Bricks; weathering; efflorescence; visual inspection",
+            "Bricks; salt crystallization; cracking; visual inspection",
+            "Bricks; salt crystallization; spalling; visual inspection",
+            "Bricks; salt crystallization; efflorescence; visual inspection",
+            "Bricks; weathering; cracking; ultrasonic testing",
+            "Bricks; weathering; spalling; ultrasonic testing",
+            "Bricks; weathering; efflorescence; ultrasonic testing",
+            "Bricks; salt crystallization; cracking; ultrasonic testing",
+            "Bricks; salt crystallization; efflorescence; ultrasonic testing",
+            "Bricks; weathering; cracking; infrared thermography",
+            "Bricks; weathering; spalling; infrared thermography",
+            "Bricks; weathering; efflorescence; infrared thermography",
+            "Bricks; salt crystallization; cracking; infrared thermography",
+            "Bricks; salt crystallization; spalling; infrared thermography",
+            "Bricks; salt crystallization; efflorescence; infrared thermography",
+            "Bricks; weathering; dimensional changes; visual inspection",
+            "Bricks; salt crystallization; dimensional changes; ultrasonic testing",
+            "Bricks; weathering; dimensional changes; ultrasonic testing",
+            "Bricks; weathering; dimensional changes; infrared thermography",
+            "Bricks; salt crystallization; dimensional changes; visual inspection",
+            "Bricks; salt crystallization; dimensional changes; infrared thermography",
+            "Bricks; weathering; cracking; impact-echo testing",
+            "Bricks; salt crystallization; spalling; impact-echo testing",
+            "Bricks; weathering; efflorescence; moisture meters",
+            "Bricks; salt crystallization; efflorescence; moisture meters"
+        ]
+    }
+    return [entry for data_entries in materials_data.values() for entry in data_entries]
+
+# Tuples read from the input files to time the candidate batch sizes on
+TUNING_SAMPLE_SIZE = 5000
+
+def source_entries(paths=None):
+    """Stream the tuples of the extraction output files, or the built-in tuples when there are none."""
+    return iter_entries(paths) if paths else iter(builtin_entries())
+
+@METRICS.timed("graph_load")
+def load_data(batch_size=DEFAULT_BATCH_SIZE, tune=False, workers=1, paths=None):
+    with get_driver().session() as session:
         # Create material nodes
-        session.write_transaction(create_material_nodes)
-
-        # Load and parse data for each material
-        materials_data = {
-            'Concrete': [
-                "Concrete; corrosion; cracking; visual inspection",
-                "Concrete; corrosion; spalling; ultrasonic testing",
-                "Concrete; corrosion; discoloration; infrared thermography",
-                "Concrete; freeze-thaw cycles; cracking; visual inspection",
-                "Concrete; freeze-thaw cycles; spalling; ultrasonic testing",
-                "Concrete; freeze-thaw cycles; discoloration; infrared thermography",
-                "Concrete; chemical attack; cracking; visual inspection",
-                "Concrete; chemical attack; spalling; ultrasonic testing",
-                "Concrete; chemical attack; discoloration; infrared thermography",
-                "Concrete; changes in microstructure; cracking; visual inspection",
-                "Concrete; changes in microstructure; spalling; ultrasonic testing",
-                "Concrete; changes in microstructure; discoloration; infrared thermography",
-                "Concrete; changes in mechanical properties; cracking; visual inspection",
-                "Concrete; changes in mechanical properties; spalling; ultrasonic testing",
-                "Concrete; changes in mechanical properties; discoloration; infrared thermography",
-                "Concrete; dimensional changes; cracking; visual inspection",
-                "Concrete; dimensional changes; spalling; ultrasonic testing",
-                "Concrete; dimensional changes; discoloration; infrared thermography",
-                "Concrete; corrosion; cracking; half-cell potential measurement",
-                "Concrete; corrosion; spalling; half-cell potential measurement",
-                "Concrete; corrosion; discoloration; half-cell potential measurement",
-                "Concrete; freeze-thaw cycles; cracking; ultrasonic pulse velocity",
-                "Concrete; freeze-thaw cycles; spalling; ultrasonic pulse velocity",
-                "Concrete; freeze-thaw cycles; discoloration; ultrasonic pulse velocity",
-                "Concrete; chemical attack; cracking; permeation test",
-                "Concrete; chemical attack; spalling; permeation test",
-                "Concrete; chemical attack; discoloration; permeation test",
-                "Concrete; extreme temperature changes; cracking; resonant frequency methods",
-                "Concrete; extreme temperature changes; spalling; resonant frequency methods",
-                "Concrete; extreme temperature changes; discoloration; resonant frequency methods",
-                "Concrete; mechanical loading; cracking; impact-echo method",
-                "Concrete; mechanical loading; spalling; impact-echo method",
-                "Concrete; mechanical loading; voids; impact-echo method",
-                "Concrete; mechanical loading; delamination; impact-echo method",
-                "Concrete; moisture ingress; cracking; chloride-ion permeability test",
-                "Concrete; moisture ingress; spalling; chloride-ion permeability test",
-                "Concrete; moisture ingress; discoloration; chloride-ion permeability test",
-                "Concrete; corrosion; cracking; half-cell potential test",
-                "Concrete; corrosion; spalling; half-cell potential test",
-                "Concrete; freeze-thaw cycles; cracking; visual inspection",
-                "Concrete; freeze-thaw cycles; spalling; visual inspection",
-                "Concrete; chemical attack; discoloration; visual inspection",
-                "Concrete; chemical attack; cracking; ultrasonic testing",
-                "Concrete; carbonation; cracking; ultrasonic testing",
-                "Concrete; carbonation; spalling; infrared thermography",
-                "Concrete; chloride ion content; cracking; infrared thermography",
-                "Concrete; chloride ion content; spalling; acoustic techniques",
-                "Concrete; changes in microstructure; cracking; acoustic techniques",
-                "Concrete; changes in microstructure; spalling; rebound hammer",
-                "Concrete; changes in mechanical properties; cracking; pullout test",
-                "Concrete; changes in mechanical properties; spalling; pull-off test",
-                "Concrete; dimensional changes; cracking; penetration resistance methods",
-                "Concrete; dimensional changes; spalling; ultrasonic pulse velocity method",
-            ],
-            'Steel': [
-                "Steel; corrosion; thinning; ultrasonic testing",
-                "Steel; corrosion; pitting; eddy current testing",
-                "Steel; fatigue; cracking; radiographic testing",
-                "Steel; stress corrosion cracking; cracking; eddy current testing",
-                "Steel; corrosion; changes in microstructure; visual testing",
-                "Steel; fatigue; changes in mechanical properties; eddy current testing",
-                "Steel; stress corrosion cracking; dimensional changes; acoustic emission",
-                "Steel; corrosion; pitting; ultrasonic testing",
-                "Steel; corrosion; cracking; ultrasonic testing",
-                "Steel; fatigue; cracking; eddy current testing",
-                "Steel; corrosion; thinning; eddy current testing",
-                "Steel; corrosion; cracking; eddy current testing",
-                "Steel; fatigue; cracking; acoustic emission",
-                "Steel; stress corrosion cracking; cracking; acoustic emission",
-                "Steel; corrosion; thinning; x-radiography",
-                "Steel; corrosion; pitting; x-radiography",
-                "Steel; corrosion; cracking; x-radiography",
-                "Steel; fatigue; cracking; x-radiography",
-                "Steel; stress corrosion cracking; cracking; x-radiography",
-                "Steel; corrosion; thinning; laser-based technique",
-                "Steel; corrosion; pitting; laser-based technique",
-                "Steel; corrosion; cracking; laser-based technique",
-                "Steel; fatigue; cracking; laser-based technique",
-                "Steel; stress corrosion cracking; cracking; laser-based technique",
-                "Steel; stress corrosion cracking; cracking; visual testing",
-                "Steel; residual stresses; changes in mechanical properties; ultrasonic critical refracted longitudinal waves",
-                "Steel; fatigue; cracking; guided ultrasonic wave procedure",
-                "Steel; corrosion; thinning; radiographic testing",
-                "Steel; corrosion; thinning; acoustic emissions",
-                "Steel; fatigue; cracking; ultrasonic testing",
-                "Steel; fatigue; cracking; acoustic emissions",
-                "Steel; stress corrosion cracking; cracking; radiographic testing",
-                "Steel; stress corrosion cracking; cracking; ultrasonic testing",
-                "Steel; stress corrosion cracking; cracking; acoustic emissions",
-                "Steel; corrosion; pitting; radiographic testing",
-                "Steel; corrosion; pitting; acoustic emissions",
-                "Steel; fatigue; changes in microstructure; radiographic testing",
-                "Steel; fatigue; changes in microstructure; ultrasonic testing",
-                "Steel; fatigue; changes in microstructure; eddy current testing",
-                "Steel; fatigue; changes in microstructure; acoustic emissions",
-                "Steel; stress corrosion cracking; changes in microstructure; radiographic testing",
-                "Steel; stress corrosion cracking; changes in microstructure; ultrasonic testing",
-                "Steel; stress corrosion cracking; changes in microstructure; eddy current testing",
-                "Steel; stress corrosion cracking; changes in microstructure; acoustic emissions",
-                "Steel; corrosion; changes in mechanical properties; radiographic testing",
-                "Steel; corrosion; changes in mechanical properties; ultrasonic testing",
-                "Steel; corrosion; changes in mechanical properties; eddy current testing",
-                "Steel; corrosion; changes in mechanical properties; acoustic emissions",
-                "Steel; fatigue; changes in mechanical properties; radiographic testing",
-                "Steel; fatigue; changes in mechanical properties; ultrasonic testing",
-                "Steel; fatigue; changes in mechanical properties; acoustic emissions",
-                "Steel; stress corrosion cracking; changes in mechanical properties; radiographic testing",
-                "Steel; stress corrosion cracking; changes in mechanical properties; ultrasonic testing",
-                "Steel; stress corrosion cracking; changes in mechanical properties; eddy current testing",
-                "Steel; stress corrosion cracking; changes in mechanical properties; acoustic emissions",
-                "Steel; corrosion; dimensional changes; radiographic testing",
-                "Steel; corrosion; dimensional changes; ultrasonic testing",
-                "Steel; corrosion; dimensional changes; eddy current testing",
-                "Steel; corrosion; dimensional changes; acoustic emissions",
-                "Steel; fatigue; dimensional changes; radiographic testing",
-                "Steel; fatigue; dimensional changes; ultrasonic testing",
-                "Steel; fatigue; dimensional changes; eddy current testing",
-                "Steel; fatigue; dimensional changes; acoustic emissions",
-                "Steel; stress corrosion cracking; dimensional changes; radiographic testing",
-                "Steel; stress corrosion cracking; dimensional changes; ultrasonic testing",
-                "Steel; stress corrosion cracking; dimensional changes; eddy current testing",
-                "Steel; stress corrosion cracking; dimensional changes; acoustic emissions",
-                "Steel; corrosion; pitting; radiographic inspection",
-                "Steel; fatigue; dimensional changes; acoustic emission",
-                "Steel; corrosion; changes in mechanical properties; radiographic inspection",
-                "Steel; fatigue; changes in mechanical properties; acoustic emission",
-                "Steel; corrosion; changes in microstructure; radiographic inspection",
-                "Steel; fatigue; pitting; acoustic emission",
-                "Steel; fatigue; changes in mechanical properties; acoustic emission testing",
-                "Steel; corrosion; changes in microstructure; eddy current testing",
-                "Steel; fatigue; changes in microstructure; x-ray diffraction analysis",
-                "Steel; fatigue; dimensional changes; acoustic emission testing",
-                "Steel; corrosion; changes in microstructure; ultrasonic testing",
-            ],
-            'Wood': [
-                "Wood; fungal decay; changes in structure geometry; visual inspection",
-                "Wood; fungal decay; changes in material macro- & microstructure; ultrasonic testing",
-                "Wood; insect attack; discontinuity of material; visual inspection",
-                "Wood; insect attack; changes in structure geometry; ultrasonic testing",
-                "Wood; UV exposure; surface roughness; visual inspection",
-                "Wood; UV exposure; erosion of early-wood; visual inspection",
-                "Wood; mechanical wear; crack formation; visual inspection",
-                "Wood; mechanical wear; delamination; visual inspection",
-                "Wood; moisture changes; crack formation; visual inspection",
-                "Wood; moisture changes; delamination; visual inspection",
-                "Wood; mechanical long-term load; changes in mechanical parameters; visual inspection",
-                "Wood; mechanical long-term load; changes in structure geometry; visual inspection",
-                "Wood; fungal decay; changes in density; electrical resistance",
-                "Wood; fungal decay; changes in material macro- & microstructure; computed tomography",
-                "Wood; insect attack; discontinuity of material; acoustic emission",
-                "Wood; insect attack; changes in structure geometry; computed tomography",
-                "Wood; insect attack; changes in material macro- & microstructure; X-ray imaging",
-                "Wood; insect attack; changes in mechanical parameters; acoustic emission",
-                "Wood; insect attack; changes in structure geometry; acoustic emission",
-                "Wood; insect attack; changes in material macro- & microstructure; drilling resistance",
-                "Wood; insect attack; changes in mechanical parameters; eigenfrequency measurements",
-                "Wood; insect attack; changes in structure geometry; video image correlation",
-                "Wood; insect attack; changes in material macro- & microstructure; thermography",
-                "Wood; insect attack; changes in chemical constitution; chemical analyses using spectroscopy",
-                "Wood; insect attack; changes in structure geometry; visual inspection",
-                "Wood; insect attack; changes in material macro- & microstructure; classical microscopic methods",
-                "Wood; insect attack; changes in structure geometry; strain measurements",
-                "Wood; insect attack; changes in material macro- & microstructure; colour measurements",
-                "Wood; insect attack; changes in structure geometry; delamination surveys",
-                "Wood; insect attack; changes in material macro- & microstructure; computed tomography",
-                "Wood; fungal decay; changes in structure geometry; X-ray/synchrotron",
-                "Wood; fungal decay; changes in material macro- & microstructure; X-ray/synchrotron",
-                "Wood; fungal decay; mechanical parameters; X-ray/synchrotron",
-                "Wood; fungal decay; discontinuity of material; X-ray/synchrotron",
-                "Wood; fungal decay; water & gas resistance; X-ray/synchrotron",
-                "Wood; fungal decay; chemical constitution; X-ray/synchrotron",
-                "Wood; oxidation; changes in structure geometry; Colour measurement/gloss level",
-                "Wood; oxidation; changes in material macro- & microstructure; Colour measurement/gloss level",
-                "Wood; oxidation; mechanical parameters; Colour measurement/gloss level",
-                "Wood; oxidation; discontinuity of material; Colour measurement/gloss level",
-                "Wood; oxidation; water & gas resistance; Colour measurement/gloss level",
-                "Wood; oxidation; chemical constitution; Colour measurement/gloss level",
-                "Wood; mechanical load; changes in structure geometry; Optical imaging methods (video image correlation)",
-                "Wood; mechanical load; changes in material macro- & microstructure; Optical imaging methods (video image correlation)",
-                "Wood; mechanical load; mechanical parameters; Optical imaging methods (video image correlation)",
-                "Wood; mechanical load; discontinuity of material; Optical imaging methods (video image correlation)",
-                "Wood; mechanical load; water & gas resistance; Optical imaging methods (video image correlation)",
-                "Wood; mechanical load; chemical constitution; Optical imaging methods (video image correlation)",
-                "Wood; moisture content; changes in structure geometry; Moisture measurement",
-                "Wood; moisture content; changes in material macro- & microstructure; Moisture measurement",
-                "Wood; moisture content; mechanical parameters; Moisture measurement",
-                "Wood; moisture content; discontinuity of material; Moisture measurement",
-                "Wood; moisture content; water & gas resistance; Moisture measurement",
-                "Wood; moisture content; chemical constitution; Moisture measurement",
-                "Wood; rot; changes in structure geometry; Electric resistance measurements",
-                "Wood; rot; changes in material macro- & microstructure; Electric resistance measurements",
-                "Wood; rot; mechanical parameters; Electric resistance measurements",
-                "Wood; rot; discontinuity of material; Electric resistance measurements",
-                "Wood; rot; water & gas resistance; Electric resistance measurements",
-                "Wood; rot; chemical constitution; Electric resistance measurements",
-                "Wood; knots; changes in structure geometry; Thermography",
-                "Wood; knots; changes in material macro- & microstructure; Thermography",
-                "Wood; knots; mechanical parameters; Thermography",
-                "Wood; knots; discontinuity of material; Thermography",
-                "Wood; knots; water & gas resistance; Thermography",
-                "Wood; knots; chemical constitution; Thermography",
-                "Wood; delamination; changes in structure geometry; Thermography",
-                "Wood; delamination; changes in material macro- & microstructure; Thermography",
-                "Wood; delamination; mechanical parameters; Thermography",
-                "Wood; delamination; discontinuity of material; Thermography",
-                "Wood; delamination; water & gas resistance; Thermography",
-                "Wood; delamination; chemical constitution; Thermography",
-                "Wood; fungal decay; mechanical parameters; thermography",
-                "Wood; insect attack; discontinuity of material; radiography",
-                "Wood; insect attack; water & gas resistance; neutron imaging",
-                "Wood; UV exposure; chemical constitution; near-infrared spectroscopy",
-            ],
-            'Bricks': [
-                "Bricks; salt crystallization; spalling; ultrasonic testing",
-                "Bricks; weathering; cracking; visual inspection",
-                "Bricks; weathering; spalling; visual inspection",
-                "Bricks; weathering; efflorescence; visual inspection",
-                "Bricks; salt crystallization; cracking; visual inspection",
-                "Bricks; salt crystallization; spalling; visual inspection",
-                "Bricks; salt crystallization; efflorescence; visual inspection",
-                "Bricks; weathering; cracking; ultrasonic testing",
-                "Bricks; weathering; spalling; ultrasonic testing",
-                "Bricks; weathering; efflorescence; ultrasonic testing",
-                "Bricks; salt crystallization; cracking; ultrasonic testing",
-                "Bricks; salt crystallization; efflorescence; ultrasonic testing",
-                "Bricks; weathering; cracking; infrared thermography",
-                "Bricks; weathering; spalling; infrared thermography",
-                "Bricks; weathering; efflorescence; infrared thermography",
-                "Bricks; salt crystallization; cracking; infrared thermography",
-                "Bricks; salt crystallization; spalling; infrared thermography",
-                "Bricks; salt crystallization; efflorescence; infrared thermography",
-                "Bricks; weathering; dimensional changes; visual inspection",
-                "Bricks; salt crystallization; dimensional changes; ultrasonic testing",
-                "Bricks; weathering; dimensional changes; ultrasonic testing",
-                "Bricks; weathering; dimensional changes; infrared thermography",
-                "Bricks; salt crystallization; dimensional changes; visual inspection",
-                "Bricks; salt crystallization; dimensional changes; infrared thermography",
-                "Bricks; weathering; cracking; impact-echo testing",
-                "Bricks; salt crystallization; spalling; impact-echo testing",
-                "Bricks; weathering; efflorescence; moisture meters",
-                "Bricks; salt crystallization; efflorescence; moisture meters"
-            ]
-        }
-
-        for material, data_entries in materials_data.items():
-            for entry in data_entries:
-                parts = entry.split(';')
-                if len(parts) == 4:
-                    mat, deterioration, physical_change, ndt_method = parts
-                    session.write_transaction(create_deterioration_nodes, mat.strip(), deterioration.strip(), physical_change.strip(), ndt_method.strip())
+        session.execute_write(create_material_nodes)
+
+        entries = source_entries(paths)
+        if tune:
+            batch_size = tune_batch_size(session, itertools.islice(source_entries(paths), TUNING_SAMPLE_SIZE))
+            logging.info(f"Using batch size {batch_size}")
+        if workers <= 1:
+            write_entries(session, entries, batch_size)
+    if workers > 1:
+        load_entries_concurrently(entries, workers, batch_size)
 
 if __name__ == "__main__":
-    # Clear existing content
-    with driver.session() as session:
-        session.run("MATCH (n) DETACH DELETE n")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Load the material deterioration tuples into Neo4j")
+    parser.add_argument("inputs", nargs="*", help="extraction output files to load (RTF, plain text, JSON or JSONL); "
+                                                  "the built-in tuples when omitted")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="tuples written per transaction")
+    parser.add_argument("--workers", type=int, default=1, help="concurrent sessions writing batches (async driver)")
+    parser.add_argument("--tune-batch-size", action="store_true", help="time several batch sizes and load with the fastest")
+    parser.add_argument("--sync", action="store_true", help="apply only the difference to the graph instead of wiping and reloading it")
+    parser.add_argument("--dry-run", action="store_true", help="with --sync, only report what would change")
+    parser.add_argument("--compare-schema", action="store_true", help="load once without and once with the uniqueness constraints and report both times")
+    args = parser.parse_args()
+
+    if args.compare_schema:
+        compare_schema_load_times(lambda: load_data(args.batch_size, paths=args.inputs))
+    elif args.sync or args.dry_run:
+        sync_graph(source_entries(args.inputs), args.batch_size, args.dry_run)
+    else:
+        # Clear existing content; constraints survive, so every MERGE below is index-backed
+        with get_driver().session() as session:
+            session.run("MATCH (n) DETACH DELETE n")
+            ensure_schema(session)
 
-    # Load new data
-    load_data()
+        # Load new data
+        load_data(args.batch_size, args.tune_batch_size, args.workers, args.inputs)
+    logging.info(f"Graph load metrics: {METRICS.report()}")
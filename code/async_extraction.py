@@ -0,0 +1,238 @@
+import openai
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+
+from llm_cache import acached_chat_completion
+from llm_backend import get_backend
+from chunking import count_request_tokens
+from config import LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+from metrics import METRICS
+
+class TokenBucket:
+    """Bucket refilled continuously at capacity_per_minute, starting full."""
+
+    def __init__(self, capacity_per_minute):
+        self.capacity = capacity_per_minute
+        self.rate = capacity_per_minute / 60.0
+        self.tokens = float(capacity_per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        self._refill()
+        # A single request larger than the whole bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+class RateLimiter:
+    """Enforces both a requests-per-minute and a tokens-per-minute budget."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens):
+        async with self._lock:
+            while True:
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if wait <= 0:
+                    break
+                logging.debug(f"Rate limit reached, waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+
+def estimate_request_tokens(request):
+    # The provider counts max_tokens against the budget up front, whatever the completion turns out to be
+    return count_request_tokens(request) + request["max_tokens"]
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight requests.
+
+    Every success raises the limit by 1/limit (about +1 per round of requests) up to maximum,
+    unless the p95 latency has climbed to latency_factor times the best p50 seen so far, which
+    means the service is queueing. Every 429 halves the limit; 5xx errors and timeouts cut it by a quarter.
+    """
+
+    def __init__(self, initial, minimum=1, maximum=None, latency_factor=2.0, window=100):
+        self.minimum = minimum
+        self.maximum = maximum or initial
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.latency_factor = latency_factor
+        self.latencies = deque(maxlen=window)
+        self.baseline_latency = None
+        self.in_flight = 0
+        self.successes = 0
+        self.throttle_events = 0
+        self.server_errors = 0
+        self.retries = 0
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def percentile(self, fraction):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def on_success(self, latency):
+        self.successes += 1
+        self.latencies.append(latency)
+        if len(self.latencies) >= 10:
+            p50 = self.percentile(0.5)
+            self.baseline_latency = p50 if self.baseline_latency is None else min(self.baseline_latency, p50)
+            if self.percentile(0.95) > self.latency_factor * self.baseline_latency:
+                return
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def _decrease(self, factor):
+        # A burst of failures from requests sent together counts as a single congestion signal
+        now = time.monotonic()
+        if now - self._last_decrease < (self.percentile(0.5) or 1.0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * factor)
+
+    def on_throttle(self):
+        self.throttle_events += 1
+        self._decrease(0.5)
+        logging.warning(f"Rate limited; concurrency limit now {int(self.limit)}")
+
+    def on_server_error(self):
+        self.server_errors += 1
+        self._decrease(0.75)
+
+    def metrics(self):
+        return {
+            "concurrency_limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "successes": self.successes,
+            "throttle_events": self.throttle_events,
+            "server_errors": self.server_errors,
+            "retries": self.retries,
+            "latency_p50": self.percentile(0.5),
+            "latency_p95": self.percentile(0.95),
+            "latency_p99": self.percentile(0.99),
+        }
+
+def _classify_error(error):
+    """Return "throttle" for rate limiting, "server" for retryable server/network failures, None otherwise."""
+    errors = getattr(openai, "error", None)
+    status = getattr(error, "http_status", None)
+    if status == 429 or (errors is not None and isinstance(error, errors.RateLimitError)):
+        return "throttle"
+    if status is not None and status >= 500:
+        return "server"
+    if errors is not None and isinstance(error, (errors.ServiceUnavailableError, errors.Timeout, errors.APIConnectionError)):
+        return "server"
+    return None
+
+def _retry_after(error):
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, retry_after=None, base_delay=1.0, max_delay=60.0):
+    """Honour Retry-After when the server sends it, otherwise exponential backoff with full jitter."""
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base_delay)
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+async def create_with_retries(controller, limiter, max_retries=6, **request):
+    tokens = estimate_request_tokens(request)
+    for attempt in range(max_retries + 1):
+        await controller.acquire()
+        try:
+            await limiter.acquire(tokens)
+            started = time.monotonic()
+            response = await get_backend().acreate(**request)
+        except Exception as error:
+            kind = _classify_error(error)
+            if kind is None or attempt == max_retries:
+                raise
+            if kind == "throttle":
+                controller.on_throttle()
+            else:
+                controller.on_server_error()
+            controller.retries += 1
+            delay = backoff_delay(attempt, _retry_after(error))
+            logging.warning(f"Request failed ({error}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+        else:
+            latency = time.monotonic() - started
+            controller.on_success(latency)
+            METRICS.observe("llm_api_call", latency)
+            return response
+        finally:
+            await controller.release()
+        # Back off outside the slot, so waiting requests do not count against the in-flight limit
+        await asyncio.sleep(delay)
+
+def record_concurrency_metrics(controller):
+    """Export the final concurrency limit as gauges and the controller's throttles, 5xx errors and retries as counters."""
+    metrics = controller.metrics()
+    METRICS.set_gauge("llm_concurrency_limit", metrics["concurrency_limit"])
+    METRICS.set_gauge("llm_concurrency_maximum", controller.maximum)
+    METRICS.inc("llm_throttle_events", metrics["throttle_events"])
+    METRICS.inc("llm_server_errors", metrics["server_errors"])
+    METRICS.inc("llm_retries", metrics["retries"])
+
+async def _dispatch(chunks, build_request, max_concurrency, requests_per_minute, tokens_per_minute, on_result):
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    # Start at half the ceiling and let successes grow the limit towards it
+    controller = AdaptiveConcurrency(max(1, max_concurrency // 2), maximum=max_concurrency)
+
+    async def create(**request):
+        return await create_with_retries(controller, limiter, **request)
+
+    async def process(index, chunk):
+        request = build_request(chunk)
+        logging.info(f"Processing chunk {index + 1}/{len(chunks)}")
+        METRICS.inc("llm_requests")
+        with METRICS.time("llm_request"):
+            result = await acached_chat_completion(create=create, **request)
+        if on_result is not None:
+            on_result(index, result)
+        return result
+
+    try:
+        # gather returns results in submission order, whatever order the calls complete in
+        return await asyncio.gather(*(process(i, chunk) for i, chunk in enumerate(chunks)))
+    finally:
+        logging.info(f"Concurrency metrics: {controller.metrics()}")
+        record_concurrency_metrics(controller)
+
+def dispatch_chunks(chunks, build_request, max_concurrency=8, requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                    tokens_per_minute=LLM_TOKENS_PER_MINUTE, on_result=None):
+    """Send every chunk through build_request concurrently and return the responses in chunk order.
+
+    The number of requests in flight adapts between 1 and max_concurrency to rate-limit and latency
+    feedback. on_result, if given, is called with (index, response) as soon as each chunk completes.
+    The final concurrency limit, throttle events, 5xx errors, retries and the latency of every API
+    call go into METRICS.
+    """
+    chunks = list(chunks)
+    return asyncio.run(_dispatch(chunks, build_request, max_concurrency, requests_per_minute, tokens_per_minute, on_result))
@@ -0,0 +1,50 @@
+import json
+import logging
+
+from token_accounting import TOKEN_LEDGER
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+def chunk_sort_key(chunk_id):
+    document, _, index = chunk_id.rpartition('#')
+    return document, int(index) if index.isdigit() else index
+
+def write_batch_requests(path, chunk_requests):
+    """Write (chunk_id, request) pairs as a JSONL batch request file; returns the number of requests."""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        for chunk_id, request in chunk_requests:
+            line = {"custom_id": chunk_id, "method": "POST", "url": BATCH_ENDPOINT, "body": request}
+            file.write(json.dumps(line, ensure_ascii=False) + "\n")
+            count += 1
+    logging.info(f"Wrote {count} batch requests to {path}")
+    return count
+
+def read_batch_results(path):
+    """Read a JSONL batch results file into {chunk_id: response text}, ordered by document and chunk.
+
+    Failed requests are logged and left out, so they can be resubmitted on their own.
+    """
+    results = {}
+    with open(path, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                chunk_id = record["custom_id"]
+                response = record.get("response") or {}
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                # e.g. a truncated last line of a partially downloaded results file
+                logging.warning(f"Malformed batch result on line {line_number}, skipping it")
+                continue
+            if record.get("error") or response.get("status_code", 200) != 200:
+                logging.warning(f"Batch request {chunk_id} failed: {record.get('error') or response.get('status_code')}")
+                continue
+            try:
+                results[chunk_id] = response["body"]["choices"][0]["message"]["content"].strip()
+                TOKEN_LEDGER.record(response["body"].get("usage"), document=chunk_id.rpartition('#')[0], chunk=chunk_id)
+            except (KeyError, IndexError, TypeError):
+                logging.warning(f"Malformed batch result on line {line_number}: {chunk_id}")
+    logging.info(f"Read {len(results)} batch results from {path}")
+    return {chunk_id: results[chunk_id] for chunk_id in sorted(results, key=chunk_sort_key)}
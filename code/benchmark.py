@@ -0,0 +1,291 @@
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+
+import agent_kg
+from async_extraction import dispatch_chunks
+from chunking import iter_token_chunks
+from extraction_pipeline import (build_chat_request, chunk_token_budget, extract_material_info_from_pages,
+                                 post_process_extracted_data)
+from llm_backend import ReplayBackend, completion_response, completion_stream, set_backend
+from llm_cache import RESPONSE_CACHE
+from materials import get_materials
+from pdf_utils import iter_pdf_pages
+from tuple_sources import iter_entries
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_DIR, "data")
+OUTPUT_DIR = os.path.join(REPO_DIR, "code", "output")
+POST_PROCESS_SIZES = (1000, 10000, 100000)
+GRAPH_LOAD_SIZES = (1000, 10000)
+GRAPH_BATCH_SIZES = (1, 1000)
+
+class FakeBackend:
+    """Offline LLM backend that answers with tuples from earlier runs.
+
+    The answer is chosen from the prompt's hash, so the same prompt always gets the same tuples,
+    and latency simulates the API's response time.
+    """
+
+    def __init__(self, tuples, latency=0.0):
+        self.tuples = tuples
+        self.latency = latency
+        self.served = 0
+
+    def _respond(self, messages, stream=False, **request):
+        self.served += 1
+        prompt = messages[-1]["content"]
+        rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+        content = "\n".join(rng.sample(self.tuples, min(len(self.tuples), rng.randint(5, 15))))
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+        return completion_stream(content, usage) if stream else completion_response(content, usage)
+
+    def create(self, **request):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(**request)
+
+    async def acreate(self, **request):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(**request)
+
+@contextmanager
+def llm_backend(backend):
+    previous = set_backend(backend)
+    cache_enabled = RESPONSE_CACHE.enabled
+    # Every request has to reach the backend, or the benchmark measures the cache
+    RESPONSE_CACHE.enabled = False
+    try:
+        yield backend
+    finally:
+        set_backend(previous)
+        RESPONSE_CACHE.enabled = cache_enabled
+
+class FakeTransaction:
+    def __init__(self, session):
+        self.session = session
+
+    def run(self, query, **parameters):
+        self.session.rows += len(parameters.get("rows", ()))
+
+class FakeSession:
+    """Local stand-in for a Neo4j session: runs the transaction functions without a database.
+
+    latency simulates the round trip and commit of each transaction.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.transactions = 0
+        self.rows = 0
+
+    def execute_write(self, function, *args, **kwargs):
+        self.transactions += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return function(FakeTransaction(self), *args, **kwargs)
+
+    def run(self, query, **parameters):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+class FakeDriver:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.sessions = []
+
+    def session(self, **kwargs):
+        self.sessions.append(FakeSession(self.latency))
+        return self.sessions[-1]
+
+    def rows(self):
+        return sum(session.rows for session in self.sessions)
+
+def load_output_tuples(directory=OUTPUT_DIR):
+    paths = sorted(glob.glob(os.path.join(directory, "*.rtf")))
+    return [line for line in iter_entries(paths) if line.count(';') == 3]
+
+def synthetic_tuples(tuples, size, seed=0):
+    """size raw LLM lines drawn from tuples, with the duplicates, case variants and malformed lines real output has."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        line = rng.choice(tuples)
+        roll = rng.random()
+        if roll < 0.1:
+            line = line.lower()
+        elif roll < 0.15:
+            line = line.replace(';', ',', 1)
+        elif roll < 0.2:
+            line = f"{rng.randint(1, 99)}. {line}"
+        lines.append(line)
+    return lines
+
+def measure(function, repeat):
+    """Run function repeat times and return (best, median) wall time in seconds, plus its last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), statistics.median(timings), result
+
+def record(results, name, function, repeat, unit, items=None):
+    """Benchmark function into results[name]; items defaults to the length of what it returns."""
+    best, median, result = measure(function, repeat)
+    items = len(result) if items is None else items
+    results[name] = {
+        "best_seconds": round(best, 6),
+        "median_seconds": round(median, 6),
+        "items": items,
+        "unit": unit,
+        "per_second": round(items / best, 2) if best else None,
+    }
+    print(f"{name}: {items} {unit} in {best:.4f}s ({results[name]['per_second']} {unit}/s)")
+    return result
+
+def bench_pdf_parsing(results, pdf_paths, repeat):
+    all_pages = []
+    for pdf_path in pdf_paths:
+        name = f"pdf_parse[{os.path.basename(pdf_path)}]"
+        pages = record(results, name, lambda: list(iter_pdf_pages(pdf_path)), repeat, "pages")
+        results[name]["megabytes_per_second"] = round(os.path.getsize(pdf_path) / 1e6 / results[name]["best_seconds"], 2)
+        all_pages.extend(pages)
+    return all_pages
+
+def bench_chunking(results, pages, materials, repeat):
+    max_tokens = chunk_token_budget(materials=materials)
+    characters = sum(len(text) for _, text in pages)
+    chunks = record(results, "chunking", lambda: list(iter_token_chunks(pages, max_tokens)), repeat, "characters", characters)
+    results["chunking"]["chunks"] = len(chunks)
+    return chunks
+
+def bench_extraction(results, pages, chunks, materials, backend, repeat, concurrency):
+    with llm_backend(backend):
+        served = backend.served
+        record(results, "extraction_sequential", lambda: extract_material_info_from_pages(pages, materials=materials),
+               repeat, "chunks", len(chunks))
+        results["extraction_sequential"]["llm_requests"] = (backend.served - served) // repeat
+        routed = [(chunk, materials) for chunk in chunks]
+        # Limits high enough that only the fake latency and the pipeline itself are measured
+        record(results, f"extraction_concurrent[{concurrency}]",
+               lambda: dispatch_chunks(routed, lambda item: build_chat_request(item[0], materials, item[1]), concurrency,
+                                       requests_per_minute=10 ** 9, tokens_per_minute=10 ** 12),
+               repeat, "chunks")
+
+def bench_post_processing(results, tuples, materials, repeat, sizes=POST_PROCESS_SIZES):
+    for size in sizes:
+        lines = synthetic_tuples(tuples, size)
+        kept = record(results, f"post_process[{size}]", lambda: post_process_extracted_data(lines, materials), repeat, "tuples", size)
+        results[f"post_process[{size}]"]["kept"] = len(kept)
+
+def bench_graph_loading(results, tuples, repeat, sizes=GRAPH_LOAD_SIZES, batch_sizes=GRAPH_BATCH_SIZES, latency=0.0):
+    driver, fake_driver = agent_kg.driver, FakeDriver(latency)
+    agent_kg.driver = fake_driver
+    try:
+        # load_data writes its built-in tuples; write_entries is timed on larger synthetic sets
+        def load_data():
+            before = fake_driver.rows()
+            agent_kg.load_data()
+            return range(fake_driver.rows() - before)
+
+        record(results, "graph_load[load_data]", load_data, repeat, "tuples")
+        for size in sizes:
+            entries = [line for line in synthetic_tuples(tuples, size, seed=1) if line.count(';') == 3]
+            for batch_size in batch_sizes:
+                record(results, f"graph_load[{size}, batch {batch_size}]",
+                       lambda: agent_kg.write_entries(FakeSession(latency), entries, batch_size), repeat, "tuples", len(entries))
+    finally:
+        agent_kg.driver = driver
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = json.load(file)
+    print(f"Compared with {baseline_path} ({baseline.get('commit')}):")
+    for name, result in results.items():
+        old = baseline["results"].get(name)
+        if old and old["best_seconds"]:
+            change = (result["best_seconds"] - old["best_seconds"]) / old["best_seconds"] * 100
+            print(f"  {name}: {old['best_seconds']:.4f}s -> {result['best_seconds']:.4f}s ({change:+.1f}%)")
+
+def main(argv=None):
+    # The pipeline logs every chunk and tuple; keep that out of the timings
+    logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Offline benchmarks for extraction, post-processing and graph loading")
+    parser.add_argument("--pdfs", nargs="+", help="PDFs to parse (default: every PDF in data/)")
+    parser.add_argument("--max-pages", type=int, default=50, help="pages used for the chunking and extraction benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the best time is reported")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per fake LLM request")
+    parser.add_argument("--replay", metavar="CASSETTE", help="answer extraction requests from a recorded cassette instead of the fake LLM")
+    parser.add_argument("--concurrency", type=int, default=8, help="in-flight requests for the concurrent extraction benchmark")
+    parser.add_argument("--post-process-sizes", type=int, nargs="+", default=list(POST_PROCESS_SIZES))
+    parser.add_argument("--graph-sizes", type=int, nargs="+", default=list(GRAPH_LOAD_SIZES))
+    parser.add_argument("--graph-batch-sizes", type=int, nargs="+", default=list(GRAPH_BATCH_SIZES),
+                        help="tuples per transaction; 1 is the old one-transaction-per-tuple loading")
+    parser.add_argument("--graph-latency", type=float, default=0.0, help="simulated seconds per graph transaction")
+    parser.add_argument("--skip", nargs="+", default=[], choices=["pdf", "extraction", "post_process", "graph"])
+    parser.add_argument("--out", metavar="FILE", help="where to save the results (default: benchmark_<commit>.json)")
+    parser.add_argument("--compare", metavar="FILE", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+    random.seed(0)
+
+    materials = get_materials()
+    tuples = load_output_tuples()
+    results = {}
+    pages = []
+    if "pdf" not in args.skip:
+        pdf_paths = args.pdfs or sorted(glob.glob(os.path.join(DATA_DIR, "*.pdf")))
+        pages = bench_pdf_parsing(results, pdf_paths, args.repeat)
+    if "extraction" not in args.skip:
+        pages = pages[:args.max_pages] or list(iter_pdf_pages(os.path.join(DATA_DIR, "ndt_all.pdf")))[:args.max_pages]
+        chunks = bench_chunking(results, pages, materials, args.repeat)
+        backend = ReplayBackend(args.replay) if args.replay else FakeBackend(tuples, args.llm_latency)
+        bench_extraction(results, pages, chunks, materials, backend, args.repeat, args.concurrency)
+    if "post_process" not in args.skip:
+        bench_post_processing(results, tuples, materials, args.repeat, args.post_process_sizes)
+    if "graph" not in args.skip:
+        bench_graph_loading(results, tuples, args.repeat, args.graph_sizes, args.graph_batch_sizes, args.graph_latency)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    out = args.out or f"benchmark_{commit or 'local'}.json"
+    with open(out, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"Benchmark results written to {out}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import csv
+import logging
+import os
+
+from tuple_sources import iter_entries, parse_entry
+
+# (node label, row field) for each position of a tuple, and the relationship between consecutive positions
+NODE_FIELDS = (
+    ("Material", "material"),
+    ("DeteriorationMechanism", "deterioration"),
+    ("PhysicalChange", "physical_change"),
+    ("NDTMethod", "ndt_method"),
+)
+RELATIONSHIP_TYPES = ("HAS_DETERIORATION_MECHANISM", "CAUSES_PHYSICAL_CHANGE", "DETECTED_BY")
+
+def build_graph(entries):
+    """Return ({label: {name: id}}, {type: set of (start id, end id)}) for the tuples.
+
+    Nodes are numbered in (label, name) order, so the same tuple set always gets the same IDs,
+    whatever order the tuples arrive in.
+    """
+    names = {label: set() for label, _ in NODE_FIELDS}
+    rows = []
+    for entry in entries:
+        row = parse_entry(entry)
+        if row is None:
+            logging.warning(f"Skipping malformed tuple: {entry}")
+            continue
+        rows.append(row)
+        for label, field in NODE_FIELDS:
+            names[label].add(row[field])
+
+    node_ids = {}
+    next_id = 0
+    for label, _ in NODE_FIELDS:
+        node_ids[label] = {}
+        for name in sorted(names[label]):
+            node_ids[label][name] = next_id
+            next_id += 1
+
+    relationships = {rel_type: set() for rel_type in RELATIONSHIP_TYPES}
+    for row in rows:
+        ids = [node_ids[label][row[field]] for label, field in NODE_FIELDS]
+        for rel_type, start, end in zip(RELATIONSHIP_TYPES, ids, ids[1:]):
+            relationships[rel_type].add((start, end))
+    return node_ids, relationships
+
+def write_bulk_import_files(entries, out_dir):
+    """Write deduplicated node and relationship CSVs in neo4j-admin import format; returns the import command."""
+    os.makedirs(out_dir, exist_ok=True)
+    node_ids, relationships = build_graph(entries)
+    arguments = []
+    for label, ids in node_ids.items():
+        path = os.path.join(out_dir, f"nodes_{label}.csv")
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["id:ID", "name", ":LABEL"])
+            for name, node_id in sorted(ids.items(), key=lambda item: item[1]):
+                writer.writerow([node_id, name, label])
+        arguments.append(f"--nodes={path}")
+        logging.info(f"{len(ids)} {label} nodes written to {path}")
+    for rel_type, pairs in relationships.items():
+        path = os.path.join(out_dir, f"relationships_{rel_type}.csv")
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow([":START_ID", ":END_ID", ":TYPE"])
+            for start, end in sorted(pairs):
+                writer.writerow([start, end, rel_type])
+        arguments.append(f"--relationships={path}")
+        logging.info(f"{len(pairs)} {rel_type} relationships written to {path}")
+    command = " ".join(["neo4j-admin database import full --id-type=integer --overwrite-destination"] + arguments + ["neo4j"])
+    with open(os.path.join(out_dir, "import_command.txt"), 'w', encoding='utf-8') as file:
+        file.write(command + "\n")
+    return command
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Write extracted tuples as CSV files for Neo4j's offline bulk importer")
+    parser.add_argument("out_dir", help="directory for the node and relationship CSV files")
+    parser.add_argument("inputs", nargs="+", help="extraction output files (RTF, plain text, JSON or JSONL)")
+    args = parser.parse_args()
+
+    command = write_bulk_import_files(iter_entries(args.inputs), args.out_dir)
+    print(f"Stop the database, then run:\n{command}")
+    print("Afterwards start it and create the uniqueness constraints (agent_kg.ensure_schema) before any incremental load.")
@@ -0,0 +1,145 @@
+import json
+import logging
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from materials import route_material
+
+TERM_FIELDS = ("deterioration_mechanisms", "physical_changes", "ndt_methods")
+NGRAM_SIZES = (2, 3, 4)
+NON_WORD = re.compile(r"[^\w]+")
+
+# Nearest glossary terms less similar than this are left as extracted
+DEFAULT_MIN_SCORE = 0.65
+
+def char_ngrams(text, sizes=NGRAM_SIZES):
+    # Hyphens, brackets and other punctuation count as word breaks: "freeze thaw" matches "freeze-thaw"
+    words = " ".join(NON_WORD.sub(" ", text.lower()).split())
+    padded = f" {words} "
+    return [padded[i:i + size] for size in sizes for i in range(len(padded) - size + 1)]
+
+class GlossaryCanonicalizer:
+    """Maps free-text terms to their nearest glossary term by character n-gram TF-IDF cosine similarity.
+
+    The glossary matrix is built once. A batch of terms is encoded into one matrix over the
+    glossary's n-gram vocabulary and scored against every glossary term with a single matrix
+    multiply. n-grams the glossary never uses still count towards a term's norm (at the mean idf of
+    the glossary's n-grams), so a term that only shares a few n-grams with a glossary term scores
+    low, while an inflection such as a plural costs little.
+    """
+
+    def __init__(self, terms, ngram_sizes=NGRAM_SIZES, batch_size=4096):
+        self.terms = list(dict.fromkeys(terms))
+        self.ngram_sizes = ngram_sizes
+        self.batch_size = batch_size
+        self.vocabulary = {}
+        term_grams = [char_ngrams(term, ngram_sizes) for term in self.terms]
+        for grams in term_grams:
+            for gram in grams:
+                self.vocabulary.setdefault(gram, len(self.vocabulary))
+        document_frequency = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for grams in term_grams:
+            document_frequency[[self.vocabulary[gram] for gram in set(grams)]] += 1
+        # Smoothed idf, as in scikit-learn; unseen n-grams get the idf of a document frequency of 0
+        self.idf = np.log((1 + len(self.terms)) / (1 + document_frequency)) + 1
+        self.unseen_idf = float(self.idf.mean()) if len(self.idf) else 1.0
+        self.matrix = self._encode(term_grams)
+
+    def _encode(self, gram_lists):
+        """Return the L2-normalized TF-IDF rows of the n-gram lists, over the glossary vocabulary."""
+        rows, columns, unseen = [], [], np.zeros(len(gram_lists), dtype=np.float32)
+        for row, grams in enumerate(gram_lists):
+            for gram in grams:
+                column = self.vocabulary.get(gram)
+                if column is None:
+                    unseen[row] += 1
+                else:
+                    rows.append(row)
+                    columns.append(column)
+        width = len(self.vocabulary)
+        flat = np.array(rows, dtype=np.intp) * width + np.array(columns, dtype=np.intp)
+        matrix = np.bincount(flat, minlength=len(gram_lists) * width).astype(np.float32).reshape(len(gram_lists), width)
+        matrix *= self.idf
+        # Unseen n-grams have no column but still lengthen the vector
+        norms = np.sqrt((matrix ** 2).sum(axis=1) + (unseen * self.unseen_idf) ** 2)
+        nonzero = norms > 0
+        matrix[nonzero] /= norms[nonzero, None]
+        return matrix
+
+    def nearest(self, texts):
+        """Return (nearest glossary term, cosine similarity) for every text, in order."""
+        texts = list(texts)
+        unique = list(dict.fromkeys(texts))
+        best_terms, best_scores = [], np.zeros(len(unique), dtype=np.float32)
+        for start in range(0, len(unique), self.batch_size):
+            batch = self._encode([char_ngrams(text, self.ngram_sizes) for text in unique[start:start + self.batch_size]])
+            scores = batch @ self.matrix.T
+            best = scores.argmax(axis=1)
+            best_terms.extend(self.terms[index] for index in best)
+            best_scores[start:start + len(batch)] = scores[np.arange(len(batch)), best]
+        by_text = {text: (term, float(score)) for text, term, score in zip(unique, best_terms, best_scores)}
+        return [by_text[text] for text in texts]
+
+@lru_cache(maxsize=None)
+def glossary_canonicalizer(material, category):
+    return GlossaryCanonicalizer(material.glossary[category])
+
+def canonicalize_tuples(entries, materials, min_score=DEFAULT_MIN_SCORE):
+    """Map every term of the formatted tuples onto its material's glossary in one vectorized pass per field.
+
+    Terms whose nearest glossary term scores at least min_score are replaced by it; the others are
+    kept as extracted. Returns (tuples, report), where report counts the distinct terms that already
+    were glossary terms, were mapped onto one, or stayed below min_score, and lists each mapping with its score.
+    """
+    rows = []
+    for entry in entries:
+        parts = [part.strip() for part in entry.split(';')]
+        rows.append((route_material(parts[0], materials), parts))
+
+    # Collect every distinct term per (material, field), so each glossary is scored once
+    pending = {}
+    for material, parts in rows:
+        if material is not None:
+            for field, term in zip(TERM_FIELDS, parts[1:]):
+                pending.setdefault((material, field), {})[term] = None
+
+    mapping = {}
+    decisions = []
+    exact = 0
+    for (material, field), terms in pending.items():
+        terms = list(terms)
+        for term, (nearest, score) in zip(terms, glossary_canonicalizer(material, field).nearest(terms)):
+            if score >= min_score:
+                mapping[material, field, term] = nearest
+                if nearest == term:
+                    exact += 1
+                else:
+                    decisions.append({"material": material.name, "field": field, "term": term, "into": nearest,
+                                      "score": round(score, 3)})
+            else:
+                decisions.append({"material": material.name, "field": field, "term": term, "into": None,
+                                  "score": round(score, 3)})
+
+    canonical = []
+    for material, parts in rows:
+        if material is not None:
+            parts = parts[:1] + [mapping.get((material, field, term), term) for field, term in zip(TERM_FIELDS, parts[1:])]
+        canonical.append("; ".join(parts))
+    report = {
+        "terms": sum(len(terms) for terms in pending.values()),
+        "exact": exact,
+        "mapped": sum(1 for decision in decisions if decision["into"] is not None),
+        "below_min_score": sum(1 for decision in decisions if decision["into"] is None),
+        "min_score": min_score,
+        "decisions": decisions,
+    }
+    logging.info(f"Canonicalized {report['mapped']} of {report['terms']} distinct terms onto the glossary "
+                 f"({report['exact']} already glossary terms, {report['below_min_score']} below the minimum score)")
+    return canonical, report
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    logging.info(f"Canonicalization report written to {path}")
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import logging
+import os
+
+from config import CACHE_DIR
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(CACHE_DIR, "checkpoints", "last_run.jsonl")
+
+def chunk_digest(chunk, materials):
+    names = ",".join(material.name for material in materials)
+    return hashlib.sha256(f"{names}\n{chunk}".encode('utf-8')).hexdigest()
+
+class ChunkCheckpoint:
+    """Append-only JSONL log of completed chunk results for one extraction run.
+
+    Each result is written as one line and fsync'ed before the run moves on, so after a crash
+    every chunk either has a complete line or none; a torn last line is ignored on reload.
+    Without resume an existing checkpoint is discarded and the run starts from scratch.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH, resume=False):
+        self.path = path
+        self.results = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if resume and os.path.exists(path):
+            complete = 0  # Bytes up to the end of the last line that is kept
+            with open(path, 'rb') as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        logging.warning(f"Ignoring incomplete checkpoint line in {path}")
+                        if line.endswith(b"\n"):
+                            complete += len(line)
+                        continue
+                    self.results[record["chunk"]] = record["result"]
+                    complete += len(line)
+            # Cut a torn last line off, so the next record starts on a line of its own
+            os.truncate(path, complete)
+            if complete:
+                with open(path, 'rb+') as file:
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) != b"\n":
+                        # A complete record whose newline was never written
+                        file.write(b"\n")
+            logging.info(f"Resuming from {len(self.results)} checkpointed chunks in {path}")
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def __contains__(self, key):
+        return key in self.results
+
+    def get(self, key):
+        return self.results.get(key)
+
+    def record(self, key, result):
+        self.results[key] = result
+        self._file.write(json.dumps({"chunk": key, "result": result}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
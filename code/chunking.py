@@ -0,0 +1,125 @@
+import logging
+import re
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character-based estimate when tiktoken is not installed
+    tiktoken = None
+
+TOKENIZER_MODEL = "gpt-4o"
+CHARS_PER_TOKEN = 4
+
+# A sentence ends at terminal punctuation (optionally followed by closing quotes/brackets) and whitespace,
+# a paragraph at a blank line
+SENTENCE_BOUNDARY = re.compile(r'[.!?]["\')\]]*\s+|\n\s*\n')
+
+_encoding = None
+_encoding_unavailable = False
+
+def _get_encoding():
+    global _encoding, _encoding_unavailable
+    if _encoding is None and tiktoken is not None and not _encoding_unavailable:
+        try:
+            try:
+                _encoding = tiktoken.encoding_for_model(TOKENIZER_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        except (OSError, ValueError) as error:
+            # tiktoken downloads its encoding files on first use, which fails offline
+            logging.warning(f"Could not load the tiktoken encoding ({error}); estimating {CHARS_PER_TOKEN} characters per token")
+            _encoding_unavailable = True
+    return _encoding
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+def count_request_tokens(request):
+    """Prompt tokens of a chat request, including the few tokens of per-message framing."""
+    return sum(count_tokens(message["content"]) + 4 for message in request["messages"]) + 3
+
+def _split_oversized(text, max_tokens):
+    encoding = _get_encoding()
+    if encoding is None:
+        step = max_tokens * CHARS_PER_TOKEN
+        return [text[i:i + step] for i in range(0, len(text), step)]
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+def iter_sentences(pages):
+    """Yield sentences/paragraphs from streamed (page_number, text) pairs, keeping their trailing whitespace.
+
+    A sentence that runs over a page break is held back until the following page completes it.
+    """
+    pending = ""
+    for _, text in pages:
+        pending += text
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(pending):
+            yield pending[start:match.end()]
+            start = match.end()
+        pending = pending[start:]
+    if pending.strip():
+        yield pending
+
+class ChunkStats:
+    def __init__(self, max_tokens):
+        self.max_tokens = max_tokens
+        self.token_counts = []
+
+    def add(self, tokens):
+        self.token_counts.append(tokens)
+
+    def summary(self):
+        counts = self.token_counts
+        if not counts:
+            return {"chunks": 0, "total_tokens": 0}
+        return {
+            "chunks": len(counts),
+            "total_tokens": sum(counts),
+            "min_tokens": min(counts),
+            "max_tokens": max(counts),
+            "mean_tokens": round(sum(counts) / len(counts), 1),
+            "fill_ratio": round(sum(counts) / (len(counts) * self.max_tokens), 3),
+        }
+
+def iter_token_chunks(pages, max_tokens, overlap_tokens=0, stats=None):
+    """Pack whole sentences from streamed pages into chunks of at most max_tokens tokens.
+
+    Only a single sentence longer than max_tokens is ever cut, at token boundaries. With
+    overlap_tokens, each chunk starts with the trailing sentences of the previous one (up to
+    that many tokens) so tuples described across a chunk boundary are still seen whole.
+    """
+    if max_tokens <= 0:
+        raise ValueError(f"Chunks must hold at least one token, got max_tokens={max_tokens}")
+    window = []
+    window_tokens = 0
+    for sentence in iter_sentences(pages):
+        tokens = count_tokens(sentence)
+        pieces = [(sentence, tokens)] if tokens <= max_tokens else [
+            (piece, count_tokens(piece)) for piece in _split_oversized(sentence, max_tokens)
+        ]
+        for piece, piece_tokens in pieces:
+            if window and window_tokens + piece_tokens > max_tokens:
+                if stats is not None:
+                    stats.add(window_tokens)
+                yield "".join(text for text, _ in window)
+
+                carried = []
+                carried_tokens = 0
+                for text, text_tokens in reversed(window):
+                    if carried_tokens + text_tokens > min(overlap_tokens, max_tokens - piece_tokens):
+                        break
+                    carried.insert(0, (text, text_tokens))
+                    carried_tokens += text_tokens
+                window, window_tokens = carried, carried_tokens
+            window.append((piece, piece_tokens))
+            window_tokens += piece_tokens
+    if window:
+        if stats is not None:
+            stats.add(window_tokens)
+        yield "".join(text for text, _ in window)
+    if stats is not None:
+        logging.info(f"Chunk statistics: {stats.summary()}")
@@ -0,0 +1,21 @@
+import os
+
+# Directory for on-disk caches (parsed PDF text, LLM responses); override with NDT_CACHE_DIR
+CACHE_DIR = os.environ.get("NDT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+
+# Size limits of the LLM response cache; least recently used responses are evicted beyond either
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("NDT_LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("NDT_LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# API rate limits the concurrent extractor stays within (the gpt-4o tier-1 limits by default); raise them to match your account
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("NDT_LLM_RPM", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("NDT_LLM_TPM", "30000"))
+
+# Neo4j connection; each setting can be overridden with the environment variable of the same name
+NEO4J_URI = os.environ.get("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USER = os.environ.get("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "eklil@2017")
+NEO4J_MAX_POOL_SIZE = int(os.environ.get("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_CONNECTION_TIMEOUT = float(os.environ.get("NEO4J_CONNECTION_TIMEOUT", "30"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.environ.get("NEO4J_ACQUISITION_TIMEOUT", "60"))
+NEO4J_MAX_RETRY_TIME = float(os.environ.get("NEO4J_MAX_RETRY_TIME", "30"))
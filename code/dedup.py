@@ -0,0 +1,111 @@
+import difflib
+import json
+import logging
+import re
+
+TERM_FIELDS = ("deterioration_mechanisms", "physical_changes", "ndt_methods")
+
+# Generic trailing words that do not change which method or mechanism a term names
+SUFFIX_WORDS = {"testing", "test", "method", "technique", "inspection", "examination", "measurement"}
+
+def singularize(word):
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("sses", "ches", "shes", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+def canonical_term(term):
+    """Canonical key of a term: lower case, no punctuation, singular words, no generic trailing suffix.
+
+    "Acoustic Emissions", "acoustic emission" and "acoustic emission testing" all map to
+    "acoustic emission"; "radiographic testing" and "radiographic inspection" to "radiographic".
+    """
+    words = [singularize(word) for word in re.sub(r"[^\w\s]", " ", term.lower()).split()]
+    while len(words) > 1 and words[-1] in SUFFIX_WORDS:
+        words.pop()
+    return " ".join(words)
+
+class TupleDeduplicator:
+    """Collapses variant spellings of the same term before tuples reach the graph.
+
+    Each term is mapped to the first surface form seen with the same canonical key or, with a
+    similarity_threshold, with a canonical key at least that similar (difflib ratio). Tuples that
+    become identical after the mapping are dropped. Terms are remembered across calls to dedupe,
+    so documents processed one at a time share the same representatives. Every merge is recorded
+    in decisions.
+    """
+
+    def __init__(self, similarity_threshold=None):
+        self.similarity_threshold = similarity_threshold
+        self.representatives = {field: {} for field in TERM_FIELDS}
+        self.decisions = []
+        self.seen = set()
+        self.tuples_in = 0
+        self.duplicates = 0
+        self._decided = set()
+
+    def _similar(self, field, key):
+        best, best_ratio = None, self.similarity_threshold
+        for candidate in self.representatives[field]:
+            matcher = difflib.SequenceMatcher(None, key, candidate)
+            if matcher.real_quick_ratio() >= best_ratio and matcher.quick_ratio() >= best_ratio:
+                ratio = matcher.ratio()
+                if ratio >= best_ratio:
+                    best, best_ratio = candidate, ratio
+        return best, best_ratio
+
+    def resolve(self, field, term):
+        """Return the representative surface form for term, registering it if it is new."""
+        representatives = self.representatives[field]
+        key = canonical_term(term)
+        if key in representatives:
+            representative, reason = representatives[key], "canonical key"
+        elif self.similarity_threshold is not None and representatives:
+            similar, ratio = self._similar(field, key)
+            if similar is None:
+                representatives[key] = term
+                return term
+            # Later variants of this spelling go straight to the same representative
+            representative, reason = representatives[similar], f"similarity {ratio:.2f}"
+            representatives[key] = representative
+        else:
+            representatives[key] = term
+            return term
+        if term != representative and (field, term) not in self._decided:
+            self._decided.add((field, term))
+            self.decisions.append({"field": field, "term": term, "into": representative, "reason": reason})
+            logging.debug(f"Merging {field} '{term}' into '{representative}' ({reason})")
+        return representative
+
+    def add(self, entry):
+        """Return the entry with its terms mapped to their representatives, or None if that tuple was already seen."""
+        self.tuples_in += 1
+        material, *terms = [part.strip() for part in entry.split(';')]
+        terms = [self.resolve(field, term) for field, term in zip(TERM_FIELDS, terms)]
+        key = (material.lower(), *(canonical_term(term) for term in terms))
+        if key in self.seen:
+            self.duplicates += 1
+            return None
+        self.seen.add(key)
+        return "; ".join([material] + terms)
+
+    def dedupe(self, entries):
+        return [entry for entry in map(self.add, entries) if entry is not None]
+
+    def report(self):
+        return {
+            "tuples_in": self.tuples_in,
+            "tuples_out": self.tuples_in - self.duplicates,
+            "duplicates_removed": self.duplicates,
+            "terms_merged": len(self.decisions),
+            "distinct_terms": {field: len(set(representatives.values())) for field, representatives in self.representatives.items()},
+            "decisions": self.decisions,
+        }
+
+    def write_report(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, indent=2)
+        logging.info(f"Deduplication report written to {path}")
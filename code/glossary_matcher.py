@@ -0,0 +1,78 @@
+from collections import deque
+from functools import lru_cache
+
+class GlossaryMatcher:
+    """Aho-Corasick automaton over a fixed set of terms, matched case-insensitively.
+
+    Built once per glossary category; every lookup is a single pass over the text, however many
+    terms the glossary holds. values optionally maps each term to what a match should return
+    (e.g. the correct term of a correction table); by default a match returns the term itself.
+    """
+
+    def __init__(self, terms, values=None):
+        self.terms = list(terms)
+        self.values = self.terms if values is None else list(values)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for index, term in enumerate(self.terms):
+            if not term:
+                continue
+            node = 0
+            for char in term.lower():
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][char] = child
+                node = child
+            self._out[node].append(index)
+
+        # Breadth-first, so a node's failure link is final before its children need it
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text):
+        """Yield the index of every term occurrence in text, in order of where the occurrence ends."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            yield from out[node]
+
+    def contains_any(self, text):
+        return next(self.iter_matches(text), None) is not None
+
+    def matches(self, text):
+        """Return the values of all terms found in text, in glossary order."""
+        return [self.values[index] for index in sorted(set(self.iter_matches(text)))]
+
+    def best_match(self, text):
+        """Return the value of the longest term found in text (earliest in the glossary on ties), or None."""
+        best = None
+        for index in self.iter_matches(text):
+            if best is None or (len(self.terms[index]), -index) > (len(self.terms[best]), -best):
+                best = index
+        return None if best is None else self.values[best]
+
+@lru_cache(maxsize=None)
+def glossary_matcher(material, category):
+    return GlossaryMatcher(material.glossary[category])
+
+@lru_cache(maxsize=None)
+def correction_matcher(material, category):
+    table = material.corrections.get(category, {})
+    return GlossaryMatcher(table.keys(), table.values())
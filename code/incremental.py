@@ -0,0 +1,156 @@
+import glob
+import json
+import logging
+import os
+import time
+
+from config import CACHE_DIR
+from checkpoint import chunk_digest
+from pdf_utils import file_sha256, iter_cached_pdf_pages
+from extraction_pipeline import (PROMPT_TOKEN_BUDGET, collect_extracted_entries, iter_routed_chunks,
+                                 post_process_extracted_data, request_chunk_results)
+from prefilter import MIN_RELEVANCE
+from token_accounting import TOKEN_LEDGER
+from metrics import METRICS
+
+DEFAULT_MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+
+class RunManifest:
+    """Which documents (by content hash) and chunks have already been extracted and post-processed.
+
+    chunks maps a chunk digest to the raw entries the LLM returned for it, so a changed document
+    only costs requests for the chunks that actually changed. documents maps a document hash to
+    its path, chunk digests and post-processed tuples, and paths maps each file name in the corpus
+    to the hash of its current content. Documents no path refers to any more (changed or deleted
+    files) and chunks no document uses are dropped, so all_tuples only describes the corpus as it is.
+    """
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = path
+        self.documents = {}
+        self.chunks = {}
+        self.paths = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            self.documents = data.get("documents", {})
+            self.chunks = data.get("chunks", {})
+            # Manifests written before the path index existed: every document is still current
+            self.paths = data.get("paths") or {document["path"]: digest for digest, document in self.documents.items()}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({"documents": self.documents, "chunks": self.chunks, "paths": self.paths}, file)
+        os.replace(tmp_path, self.path)
+
+    def is_processed(self, digest):
+        return digest in self.documents
+
+    def track_path(self, pdf_path, digest):
+        """Point pdf_path at the document with this hash, dropping whatever it pointed at before; returns True if it changed."""
+        name = os.path.basename(pdf_path)
+        if self.paths.get(name) == digest:
+            return False
+        self.paths[name] = digest
+        self._prune()
+        return True
+
+    def forget_missing(self, pdf_paths):
+        """Drop the documents of files that are no longer among pdf_paths; returns the names forgotten."""
+        present = {os.path.basename(pdf_path) for pdf_path in pdf_paths}
+        missing = [name for name in self.paths if name not in present]
+        for name in missing:
+            logging.info(f"Document removed from the corpus: {name}")
+            del self.paths[name]
+        if missing:
+            self._prune()
+        return missing
+
+    def _prune(self):
+        current = set(self.paths.values())
+        self.documents = {digest: document for digest, document in self.documents.items() if digest in current}
+        used = {chunk_hash for document in self.documents.values() for chunk_hash in document["chunks"]}
+        self.chunks = {chunk_hash: entries for chunk_hash, entries in self.chunks.items() if chunk_hash in used}
+
+    def record_document(self, pdf_path, digest, chunk_digests, tuples):
+        self.documents[digest] = {
+            "path": os.path.basename(pdf_path),
+            "chunks": chunk_digests,
+            "tuples": tuples,
+            "processed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self.track_path(pdf_path, digest)
+
+    def all_tuples(self):
+        return [entry for document in self.documents.values() for entry in document["tuples"]]
+
+def process_document(pdf_path, digest, manifest, *, prompt_budget=PROMPT_TOKEN_BUDGET, overlap_tokens=0, materials=None,
+                     min_relevance=MIN_RELEVANCE, **request_settings):
+    """Extract the chunks of the document the manifest does not hold yet; request_settings go to request_chunk_results."""
+    METRICS.inc("documents")
+    pages = METRICS.timed_iter("pdf_page", iter_cached_pdf_pages(pdf_path))
+    routed_chunks = list(iter_routed_chunks(pages, prompt_budget=prompt_budget, overlap_tokens=overlap_tokens, materials=materials,
+                                            min_relevance=min_relevance))
+    digests = [chunk_digest(chunk, chunk_materials) for chunk, chunk_materials in routed_chunks]
+    missing = [routed for routed, chunk_hash in zip(routed_chunks, digests) if chunk_hash not in manifest.chunks]
+    logging.info(f"{pdf_path}: {len(routed_chunks) - len(missing)} of {len(routed_chunks)} chunks already extracted")
+
+    with TOKEN_LEDGER.document(os.path.basename(pdf_path)):
+        results = iter(request_chunk_results(missing, materials=materials, **request_settings))
+        for chunk_hash in digests:
+            if chunk_hash not in manifest.chunks:
+                manifest.chunks[chunk_hash] = collect_extracted_entries([next(results)])
+
+    raw_entries = [entry for chunk_hash in digests for entry in manifest.chunks[chunk_hash]]
+    tuples = post_process_extracted_data(raw_entries, materials)
+    manifest.record_document(pdf_path, digest, digests, tuples)
+    manifest.save()
+    return tuples
+
+def process_corpus_incrementally(directory, manifest, sink=None, settle_seconds=0, **extract_kwargs):
+    """Extract every PDF in directory that the manifest has not seen; returns the tuples of the new documents.
+
+    sink, if given, is called with each new document's tuples (e.g. to load them into the graph).
+    Files modified less than settle_seconds ago are left for the next pass, as they may still be copying.
+    A changed file replaces its previous version in the manifest, and deleted files are dropped from it.
+    """
+    new_tuples = []
+    pdf_paths = sorted(glob.glob(os.path.join(directory, "*.pdf")))
+    if manifest.forget_missing(pdf_paths):
+        manifest.save()
+    for pdf_path in pdf_paths:
+        if time.time() - os.path.getmtime(pdf_path) < settle_seconds:
+            continue
+        digest = file_sha256(pdf_path)
+        if manifest.is_processed(digest):
+            logging.debug(f"Already processed: {pdf_path}")
+            if manifest.track_path(pdf_path, digest):
+                manifest.save()
+            continue
+        logging.info(f"New or changed document: {pdf_path}")
+        tuples = process_document(pdf_path, digest, manifest, **extract_kwargs)
+        if sink is not None:
+            sink(tuples)
+        new_tuples.extend(tuples)
+    return new_tuples
+
+def watch_corpus(directory, manifest, interval=10, sink=None, on_change=None, **extract_kwargs):
+    """Poll directory and push every new or changed PDF through extraction (and sink) until interrupted.
+
+    on_change, if given, is called after every pass in which a document was added, changed or
+    deleted (e.g. to sync the graph, since sink never sees what was removed).
+    """
+    logging.info(f"Watching {directory} every {interval}s")
+    try:
+        while True:
+            paths = dict(manifest.paths)
+            new_tuples = process_corpus_incrementally(directory, manifest, sink, settle_seconds=interval, **extract_kwargs)
+            if new_tuples:
+                logging.info(f"Extracted {len(new_tuples)} tuples from new documents")
+            if on_change is not None and manifest.paths != paths:
+                on_change()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        logging.info("Stopped watching")
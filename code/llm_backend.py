@@ -0,0 +1,160 @@
+import openai
+import hashlib
+import json
+import logging
+import os
+import threading
+
+class ResponseObject(dict):
+    """A response (or stream event) rebuilt from plain JSON, with the item and attribute access of the openai objects."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    @classmethod
+    def wrap(cls, value):
+        if isinstance(value, dict):
+            return cls((key, cls.wrap(item)) for key, item in value.items())
+        if isinstance(value, list):
+            return [cls.wrap(item) for item in value]
+        return value
+
+def completion_response(content, usage=None):
+    return ResponseObject.wrap({"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}], "usage": usage})
+
+def completion_stream(content, usage=None):
+    """Stream events for content, one per line, ending with the usage-only event."""
+    for piece in content.splitlines(keepends=True):
+        yield ResponseObject.wrap({"choices": [{"index": 0, "delta": {"content": piece}}]})
+    yield ResponseObject.wrap({"choices": [], "usage": usage})
+
+def request_key(request):
+    """Key of a chat request by everything that determines its answer; streamed or not does not matter."""
+    fields = {name: value for name, value in request.items() if name not in ("stream", "stream_options")}
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class OpenAIBackend:
+    """Sends chat requests to the OpenAI API."""
+
+    def create(self, **request):
+        return openai.ChatCompletion.create(**request)
+
+    async def acreate(self, **request):
+        return await openai.ChatCompletion.acreate(**request)
+
+class RecordingBackend:
+    """Forwards every request to another backend and appends the request and its answer to a cassette.
+
+    The cassette is JSONL, one {"key", "request", "content", "usage"} object per request, so it can
+    be replayed with ReplayBackend. Streamed answers are recorded once the stream has ended.
+    """
+
+    def __init__(self, path, backend=None):
+        self.path = path
+        self.backend = backend or OpenAIBackend()
+        self.recorded = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _record(self, request, content, usage):
+        line = json.dumps({"key": request_key(request), "request": request, "content": content, "usage": usage}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def _record_stream(self, request, events):
+        received = []
+        usage = None
+        for event in events:
+            if event.choices:
+                received.append(event.choices[0].delta.get('content') or "")
+            else:
+                usage = event.get('usage')
+            yield event
+        self._record(request, "".join(received), usage)
+
+    def create(self, **request):
+        response = self.backend.create(**request)
+        if request.get("stream"):
+            return self._record_stream(request, response)
+        self._record(request, response.choices[0].message['content'], response.get('usage'))
+        return response
+
+    async def acreate(self, **request):
+        response = await self.backend.acreate(**request)
+        self._record(request, response.choices[0].message['content'], response.get('usage'))
+        return response
+
+    def close(self):
+        self._file.close()
+
+class CassetteMiss(LookupError):
+    pass
+
+class ReplayBackend:
+    """Answers requests from a cassette written by RecordingBackend, without any API call.
+
+    A request that is not in the cassette raises CassetteMiss. When the same request was recorded
+    several times, the answers are served in recorded order and the last one is repeated.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.answers = {}
+        self.served = 0
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    self.answers.setdefault(record["key"], []).append((record["content"], record.get("usage")))
+        self._served_per_key = {}
+        logging.info(f"Replaying {sum(len(answers) for answers in self.answers.values())} recorded responses from {path}")
+
+    def _answer(self, request):
+        key = request_key(request)
+        if key not in self.answers:
+            raise CassetteMiss(f"Request {key[:12]} is not in cassette {self.path}; record it first")
+        answers = self.answers[key]
+        index = self._served_per_key.get(key, 0)
+        self._served_per_key[key] = index + 1
+        self.served += 1
+        return answers[min(index, len(answers) - 1)]
+
+    def create(self, **request):
+        content, usage = self._answer(request)
+        if request.get("stream"):
+            return completion_stream(content, usage)
+        return completion_response(content, usage)
+
+    async def acreate(self, **request):
+        return self.create(**request)
+
+    def close(self):
+        pass
+
+_backend = OpenAIBackend()
+
+def get_backend():
+    return _backend
+
+def set_backend(backend):
+    """Route every chat request of the pipeline through backend; returns the previous one."""
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
+
+def configure_backend(record=None, replay=None):
+    """Install a recording or replaying backend for the given cassette path, if any; returns the backend in use."""
+    if record and replay:
+        raise ValueError("Cannot record and replay in the same run")
+    if record:
+        set_backend(RecordingBackend(record))
+    elif replay:
+        set_backend(ReplayBackend(replay))
+    return _backend
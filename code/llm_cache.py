@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from config import CACHE_DIR, LLM_CACHE_MAX_BYTES, LLM_CACHE_MAX_ENTRIES
+from token_accounting import TOKEN_LEDGER
+from llm_backend import get_backend
+
+class ResponseCache:
+    """SQLite-backed cache of chat completion results with LRU eviction.
+
+    Entries are keyed by a hash of every request parameter that can change the response
+    (model, temperature, max_tokens and the full message list), so any prompt or glossary
+    change produces a fresh request while identical reruns are served locally.
+    """
+
+    def __init__(self, path=None, max_entries=LLM_CACHE_MAX_ENTRIES, max_bytes=LLM_CACHE_MAX_BYTES, enabled=True):
+        self.path = path or os.path.join(CACHE_DIR, "llm_responses.sqlite3")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        return self._conn
+
+    @staticmethod
+    def make_key(model, temperature, max_tokens, messages):
+        payload = json.dumps([model, temperature, max_tokens, messages], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, len(response.encode('utf-8')), time.time()),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn):
+        count, total_size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total_size <= self.max_bytes:
+            return
+        stale_keys = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used ASC").fetchall():
+            if count <= self.max_entries and total_size <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            count -= 1
+            total_size -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+        self.evictions += len(stale_keys)
+        logging.debug(f"Evicted {len(stale_keys)} cached responses")
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "enabled": self.enabled}
+
+RESPONSE_CACHE = ResponseCache(enabled=os.environ.get("NDT_LLM_CACHE", "on").lower() not in ("0", "off", "false"))
+
+def cached_chat_completion(model, messages, max_tokens, temperature, cache=RESPONSE_CACHE, chunk_id=None, **kwargs):
+    """Return the stripped message content of a chat completion, served from the cache when possible.
+
+    chunk_id identifies the chunk in the token ledger.
+    """
+    key = cache.make_key(model, temperature, max_tokens, messages)
+    result = cache.get(key)
+    if result is not None:
+        logging.debug(f"LLM cache hit: {key[:12]}")
+        TOKEN_LEDGER.record(None, cache_hit=True, chunk=chunk_id)
+        return result
+
+    response = get_backend().create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        **kwargs
+    )
+    result = response.choices[0].message['content'].strip()
+    TOKEN_LEDGER.record(response.get('usage'), chunk=chunk_id)
+    cache.put(key, result)
+    return result
+
+async def acached_chat_completion(model, messages, max_tokens, temperature, cache=RESPONSE_CACHE, create=None, chunk_id=None,
+                                  **kwargs):
+    """Async counterpart of cached_chat_completion.
+
+    create replaces the backend's acreate for real API requests (e.g. to add rate limiting
+    and retries); it is never called on a cache hit.
+    """
+    key = cache.make_key(model, temperature, max_tokens, messages)
+    result = cache.get(key)
+    if result is not None:
+        logging.debug(f"LLM cache hit: {key[:12]}")
+        TOKEN_LEDGER.record(None, cache_hit=True, chunk=chunk_id)
+        return result
+
+    create = create or get_backend().acreate
+    response = await create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        **kwargs
+    )
+    result = response.choices[0].message['content'].strip()
+    TOKEN_LEDGER.record(response.get('usage'), chunk=chunk_id)
+    cache.put(key, result)
+    return result
+
+def stream_chat_completion(model, messages, max_tokens, temperature, cache=RESPONSE_CACHE, chunk_id=None, **kwargs):
+    """Yield the lines of a chat completion as soon as each one is complete.
+
+    The full text is cached once the stream ends, and a cache hit yields its lines straight away.
+    """
+    key = cache.make_key(model, temperature, max_tokens, messages)
+    result = cache.get(key)
+    if result is not None:
+        logging.debug(f"LLM cache hit: {key[:12]}")
+        TOKEN_LEDGER.record(None, cache_hit=True, chunk=chunk_id)
+        yield from result.split('\n')
+        return
+
+    response = get_backend().create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True,
+        stream_options={"include_usage": True},
+        **kwargs
+    )
+    received = []
+    pending = ""
+    for event in response:
+        if not event.choices:
+            # The final event carries only the usage of the whole completion
+            TOKEN_LEDGER.record(event.get('usage'), chunk=chunk_id)
+            continue
+        delta = event.choices[0].delta.get('content') or ""
+        received.append(delta)
+        pending += delta
+        *lines, pending = pending.split('\n')
+        yield from lines
+    if pending:
+        yield pending
+    cache.put(key, "".join(received).strip())
@@ -0,0 +1,262 @@
+import logging
+
+class Material:
+    """Everything the extraction pipeline needs to know about one material.
+
+    glossary holds the standard terms used to validate and normalize tuples, corrections maps
+    known misclassifications onto them, and the prompt fields describe the material to the LLM.
+    aliases are extra names (besides glossary["materials"]) that route a tuple to this material.
+    """
+
+    def __init__(self, name, glossary, corrections, description, guidelines, examples,
+                 aliases=(), require_all_fields=False):
+        self.name = name
+        self.display_name = name.capitalize()
+        self.glossary = glossary
+        self.corrections = corrections
+        self.description = description
+        self.guidelines = guidelines
+        self.examples = examples
+        self.aliases = list(aliases)
+        # When False only the material has to match the glossary for a tuple to be kept
+        self.require_all_fields = require_all_fields
+
+MATERIALS = {}
+
+def register_material(material):
+    MATERIALS[material.name] = material
+    return material
+
+def get_materials(names=None):
+    """Return the registered materials named in names (all of them by default), in registration order."""
+    if not names:
+        return list(MATERIALS.values())
+    unknown = [name for name in names if name not in MATERIALS]
+    if unknown:
+        raise ValueError(f"Unknown material(s): {', '.join(unknown)}. Registered: {', '.join(MATERIALS)}")
+    return [MATERIALS[name] for name in names]
+
+def route_material(material_field, materials):
+    """Return the first of materials whose names occur in the tuple's material field, or None."""
+    lowered = material_field.lower()
+    for material in materials:
+        if any(term.lower() in lowered for term in material.glossary["materials"] + material.aliases):
+            return material
+    logging.debug(f"No registered material for: {material_field}")
+    return None
+
+register_material(Material(
+    name="wood",
+    glossary={
+        "materials": ["wood"],
+        "deterioration_mechanisms": [
+            "fungal decay", "insect attack", "termite attack", "UV exposure", "mechanical wear",
+            "impact of fluids", "moisture changes", "oxidation", "cracking", "delamination"
+        ],
+        "physical_changes": [
+            "changes in structure geometry", "changes in material macro- & microstructure",
+            "mechanical parameters", "discontinuity of material", "water & gas resistance",
+            "chemical constitution", "density changes", "splitting", "warping", "cupping",
+            "color changes", "surface roughness", "erosion", "swelling", "shrinkage"
+        ],
+        "ndt_methods": [
+            "visual inspection", "moisture content measurement", "ultrasonic", "X-ray imaging",
+            "thermal imaging", "acoustic emission", "deformation measurement", "stress wave testing",
+            "hygrometer", "infrared thermography", "colorimetry", "surface roughness tester",
+            "laser scanning", "drilling resistance", "neutron imaging", "computed tomography",
+            "IR/NIR radiation", "electrical resistance", "modulus of elasticity measurements",
+            "sound transmission measurements", "video image correlation",
+            "ESPI (Electronic Speckle Pattern Interferometry)", "spectroscopy", "radiography",
+            "synchrotron-based tomography", "radar inspection"
+        ]
+    },
+    corrections={
+        "deterioration_mechanisms": {
+            "creeping": "mechanical stress",
+            "relaxation": "mechanical stress",
+            "pretensioning": "mechanical stress",
+            "aging": "natural aging",
+        },
+        "physical_changes": {
+            "creep": "changes in structure geometry",
+            "relaxation": "changes in mechanical parameters",
+        },
+        "ndt_methods": {
+            "visible light": "visual inspection",
+            "sound": "acoustic emission",
+        }
+    },
+    description="Material Deterioration Mechanisms are issues like fungal decay, insect attack, UV exposure, and more. Physical changes are symptoms such as changes in density, structure geometry, and more. NDT Methods include techniques like visual inspection, ultrasonic testing, and more.",
+    guidelines=[
+        "Include specific aspects such as changes in structure geometry, changes in material macro- & microstructure, mechanical parameters, discontinuity of material, water & gas resistance, and chemical constitution for Physical Changes.",
+        "Material Deterioration Mechanisms are like the symptoms (e.g., cracking, fungal decay), while the Physical Changes are the observable effects (e.g., changes in structure geometry, discontinuity of material).",
+    ],
+    examples=[
+        "Wood; fungal decay; changes in structure geometry; visual inspection",
+        "Wood; termite attack; splitting; ultrasonic",
+    ],
+    aliases=["timber"],
+    require_all_fields=False,
+))
+
+register_material(Material(
+    name="steel",
+    glossary={
+        "materials": ["steel"],
+        "deterioration_mechanisms": [
+            "corrosion", "fatigue", "stress corrosion cracking", "hydrogen embrittlement",
+            "creep", "wear", "erosion", "oxidation", "thermal fatigue", "fretting",
+            "galvanic corrosion", "pitting corrosion", "crevice corrosion", "microbiologically influenced corrosion",
+            "radiation damage", "stress relaxation", "embrittlement", "sulphide stress cracking",
+            "carburization", "decarburization", "nitriding", "graphitization"
+        ],
+        "physical_changes": [
+            "cracking", "thinning", "pitting", "surface roughness", "dimensional changes",
+            "changes in microstructure", "changes in mechanical properties", "deformation",
+            "changes in electrical conductivity", "changes in magnetic properties",
+            "changes in color", "loss of material", "surface deposits", "changes in grain structure",
+            "phase transformations", "void formation", "inclusion formation", "texture changes"
+        ],
+        "ndt_methods": [
+            "visual inspection", "ultrasonic testing", "magnetic particle testing",
+            "liquid penetrant testing", "eddy current testing", "radiographic testing",
+            "acoustic emission", "thermography", "shearography", "magnetic flux leakage",
+            "neutron radiography", "X-ray diffraction", "electron microscopy", "profilometry",
+            "hardness testing", "replication techniques", "optical emission spectroscopy",
+            "electrochemical noise measurement", "guided wave testing", "phased array ultrasonic testing",
+            "time of flight diffraction", "alternating current field measurement", "remote visual inspection",
+            "computed tomography", "laser scanning", "electromagnetic acoustic transducer (EMAT)"
+        ]
+    },
+    corrections={
+        "deterioration_mechanisms": {
+            "rust": "corrosion",
+            "metal fatigue": "fatigue",
+            "stress cracking": "stress corrosion cracking",
+        },
+        "physical_changes": {
+            "cracks": "cracking",
+            "material loss": "loss of material",
+        },
+        "ndt_methods": {
+            "UT": "ultrasonic testing",
+            "MT": "magnetic particle testing",
+            "PT": "liquid penetrant testing",
+            "ET": "eddy current testing",
+            "RT": "radiographic testing",
+        }
+    },
+    description="Material Deterioration Mechanisms are issues like corrosion, fatigue, stress corrosion cracking, and more. Physical changes are symptoms such as cracking, thinning, pitting, and more. NDT Methods include techniques like ultrasonic testing, magnetic particle testing, and more.",
+    guidelines=[
+        "Include specific aspects such as changes in microstructure, changes in mechanical properties, dimensional changes, and more for Physical Changes.",
+        "Material Deterioration Mechanisms are like the causes (e.g., corrosion, fatigue), while the Physical Changes are the observable effects (e.g., cracking, thinning).",
+    ],
+    examples=[
+        "Steel; corrosion; thinning; ultrasonic testing",
+        "Steel; fatigue; cracking; magnetic particle testing",
+    ],
+    aliases=["metal"],
+    require_all_fields=False,
+))
+
+register_material(Material(
+    name="concrete",
+    glossary={
+        "materials": ["concrete"],
+        "deterioration_mechanisms": [
+            "corrosion", "freeze-thaw cycles", "chemical attack", "sulfate attack",
+            "alkali-silica reaction", "carbonation", "chloride ingress", "physical abrasion",
+            "mechanical damage", "thermal cracking", "biological growth", "shrinkage",
+            "creep", "fatigue", "weathering", "scaling", "spalling", "cracking"
+        ],
+        "physical_changes": [
+            "cracking", "spalling", "discoloration", "surface roughness", "dimensional changes",
+            "loss of material", "porosity changes", "staining", "microstructural changes",
+            "strength reduction", "hardness reduction", "moisture content changes", "freeze-thaw damage",
+            "chemical composition changes", "corrosion products"
+        ],
+        "ndt_methods": [
+            "visual inspection", "ultrasonic testing", "infrared thermography", "acoustic emission",
+            "X-ray diffraction", "scanning electron microscopy (SEM)", "moisture meter",
+            "hardness testing", "colorimetry", "surface roughness tester", "digital image correlation",
+            "drilling resistance", "neutron imaging", "computed tomography (CT)", "spectroscopy",
+            "porosimetry", "electrical resistivity", "magnetic resonance imaging (MRI)", "ground penetrating radar (GPR)"
+        ]
+    },
+    corrections={
+        "deterioration_mechanisms": {
+            "rust": "corrosion",
+            "cracking due to freeze-thaw": "freeze-thaw cycles",
+        },
+        "physical_changes": {
+            "cracks": "cracking",
+            "material loss": "loss of material",
+        },
+        "ndt_methods": {
+            "UT": "ultrasonic testing",
+            "GPR": "ground penetrating radar",
+        }
+    },
+    description="Material Deterioration Mechanisms are issues like corrosion, freeze-thaw cycles, chemical attack, and more. Physical changes are symptoms such as cracking, spalling, discoloration, and more. NDT Methods include techniques like ultrasonic testing, infrared thermography, and more.",
+    guidelines=[
+        "Include specific aspects such as changes in microstructure, changes in mechanical properties, dimensional changes, and more for Physical Changes.",
+        "Material Deterioration Mechanisms are like the causes (e.g., corrosion, freeze-thaw cycles), while the Physical Changes are the observable effects (e.g., cracking, spalling).",
+    ],
+    examples=[
+        "Concrete; corrosion; cracking; visual inspection",
+        "Concrete; freeze-thaw cycles; spalling; ultrasonic testing",
+    ],
+    aliases=[],
+    require_all_fields=True,
+))
+
+register_material(Material(
+    name="bricks",
+    glossary={
+        "materials": ["bricks"],
+        "deterioration_mechanisms": [
+            "weathering", "salt crystallization", "freeze-thaw cycles", "chemical attack",
+            "biological growth", "mechanical damage", "thermal stress", "erosion", "abrasion",
+            "efflorescence", "spalling", "cracking", "sulfate attack", "alkali-silica reaction"
+        ],
+        "physical_changes": [
+            "cracking", "spalling", "efflorescence", "discoloration", "surface roughness",
+            "dimensional changes", "loss of material", "porosity changes", "staining",
+            "microstructural changes", "strength reduction", "hardness reduction",
+            "moisture content changes", "freeze-thaw damage", "chemical composition changes"
+        ],
+        "ndt_methods": [
+            "visual inspection", "ultrasonic testing", "infrared thermography",
+            "acoustic emission", "X-ray diffraction", "scanning electron microscopy (SEM)",
+            "moisture meter", "hardness testing", "colorimetry", "surface roughness tester",
+            "digital image correlation", "drilling resistance", "neutron imaging",
+            "computed tomography (CT)", "spectroscopy", "porosimetry",
+            "electrical resistivity", "magnetic resonance imaging (MRI)"
+        ]
+    },
+    corrections={
+        "deterioration_mechanisms": {
+            "freeze-thaw cycles": "freeze-thaw damage",
+            "chemical degradation": "chemical attack",
+        },
+        "physical_changes": {
+            "cracks": "cracking",
+            "spalled": "spalling",
+        },
+        "ndt_methods": {
+            "thermography": "infrared thermography",
+            "visual check": "visual inspection",
+        }
+    },
+    description="Material Deterioration Mechanisms are issues like weathering, salt crystallization, freeze-thaw cycles, and more. Physical changes are symptoms such as cracking, spalling, efflorescence, and more. NDT Methods include techniques like ultrasonic testing, infrared thermography, and more.",
+    guidelines=[
+        "Include specific aspects such as changes in microstructure, changes in mechanical properties, dimensional changes, and more for Physical Changes.",
+        "Material Deterioration Mechanisms are like the causes (e.g., weathering, salt crystallization), while the Physical Changes are the observable effects (e.g., cracking, spalling).",
+    ],
+    examples=[
+        "Bricks; weathering; cracking; visual inspection",
+        "Bricks; salt crystallization; spalling; ultrasonic testing",
+    ],
+    aliases=["brick", "masonry"],
+    require_all_fields=True,
+))
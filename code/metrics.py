@@ -0,0 +1,128 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+class Histogram:
+    """Every observed value of one stage, for count, sum and percentiles."""
+
+    def __init__(self):
+        self.values = []
+
+    def observe(self, value):
+        self.values.append(value)
+
+    def percentile(self, fraction):
+        if not self.values:
+            return None
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self):
+        return {
+            "count": len(self.values),
+            "sum": round(sum(self.values), 6),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+class Metrics:
+    """Counters and per-stage latency histograms for one run of the pipeline.
+
+    Stages are timed with the timed decorator or the time context manager; counters count work
+    items (pages, chunks, tuples kept and rejected) and gauges hold the last value of a level
+    (e.g. the adaptive concurrency limit). report() derives throughput from the wall time
+    since the run started, and the whole thing can be exported as JSON or Prometheus text.
+    """
+
+    def __init__(self, prefix="ndt"):
+        self.prefix = prefix
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.started = time.monotonic()
+
+    def inc(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def observe(self, stage, seconds):
+        self.histograms.setdefault(stage, Histogram()).observe(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.monotonic() - started)
+
+    def timed(self, stage):
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.time(stage):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def timed_iter(self, stage, iterable):
+        """Yield from iterable, observing the time spent producing each item (e.g. parsing each page)."""
+        iterator = iter(iterable)
+        while True:
+            started = time.monotonic()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.observe(stage, time.monotonic() - started)
+            yield item
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        kept = self.counters.get("tuples_kept", 0)
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "tuples_per_second": round(kept / elapsed, 3) if elapsed else None,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "stages": {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+        }
+
+    def prometheus(self):
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            metric = f"{self.prefix}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, value in sorted(self.gauges.items()):
+            metric = f"{self.prefix}_{name}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        if self.histograms:
+            metric = f"{self.prefix}_stage_duration_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for stage, histogram in sorted(self.histograms.items()):
+                summary = histogram.summary()
+                for quantile in ("0.5", "0.95", "0.99"):
+                    value = histogram.percentile(float(quantile))
+                    lines.append(f'{metric}{{stage="{stage}",quantile="{quantile}"}} {value}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {summary["sum"]}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {summary["count"]}')
+        report = self.report()
+        lines += [f"# TYPE {self.prefix}_tuples_per_second gauge", f"{self.prefix}_tuples_per_second {report['tuples_per_second']}"]
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, indent=2)
+        logging.info(f"Metrics report written to {path}")
+
+    def write_prometheus(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.prometheus())
+        logging.info(f"Prometheus metrics written to {path}")
+
+METRICS = Metrics()
@@ -0,0 +1,117 @@
+import PyPDF2
+import glob
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from config import CACHE_DIR
+
+# Bump the suffix whenever the way page text is extracted changes, so stale cache entries are ignored
+PARSER_VERSION = f"pypdf2-{PyPDF2.__version__}-1"
+
+def iter_pdf_pages(pdf_path):
+    """Yield (page_number, text) for each page of the PDF, parsing one page at a time."""
+    logging.info(f"Streaming pages from PDF: {pdf_path}")
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page_number, page in enumerate(reader.pages, 1):
+            text = page.extract_text() or ""
+            logging.debug(f"Parsed page {page_number} ({len(text)} characters)")
+            yield page_number, text
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _cache_path(digest, cache_dir):
+    return os.path.join(cache_dir, "pdf_text", PARSER_VERSION, f"{digest}.jsonl")
+
+def _read_cached_pages(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        next(file)  # The header line
+        for line in file:
+            yield json.loads(line)
+
+def load_cached_pages(pdf_path, cache_dir=CACHE_DIR, digest=None):
+    """Return an iterator over the cached page texts of a PDF, read one page at a time, or None if it
+    has not been parsed with this parser version."""
+    path = _cache_path(digest or file_sha256(pdf_path), cache_dir)
+    if not os.path.exists(path):
+        return None
+    return _read_cached_pages(path)
+
+def _write_through_cache(pdf_path, pages, path):
+    """Yield the (page_number, text) pairs while writing each page to the cache entry at path.
+
+    Pages go to a temporary file as they arrive, which replaces the entry only once every page is in
+    it; if the pages are not consumed to the end, no entry is written.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    complete = False
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({"source": os.path.basename(pdf_path), "parser_version": PARSER_VERSION}) + "\n")
+            for page_number, text in pages:
+                file.write(json.dumps(text) + "\n")
+                yield page_number, text
+        os.replace(tmp_path, path)  # Atomic, so concurrent agents never see a half-written entry
+        complete = True
+    finally:
+        if not complete and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def store_cached_pages(pdf_path, pages, cache_dir=CACHE_DIR, digest=None):
+    """Write (page_number, text) pairs, e.g. from iter_pdf_pages, to the text cache one page at a time."""
+    path = _cache_path(digest or file_sha256(pdf_path), cache_dir)
+    for _ in _write_through_cache(pdf_path, pages, path):
+        pass
+
+def iter_cached_pdf_pages(pdf_path, cache_dir=CACHE_DIR):
+    """Like iter_pdf_pages, but served from the text cache when possible and filling it otherwise.
+
+    Either way only one page is held in memory at a time.
+    """
+    digest = file_sha256(pdf_path)
+    pages = load_cached_pages(pdf_path, cache_dir, digest)
+    if pages is not None:
+        logging.info(f"Using cached text for PDF: {pdf_path}")
+        yield from enumerate(pages, 1)
+        return
+    yield from _write_through_cache(pdf_path, iter_pdf_pages(pdf_path), _cache_path(digest, cache_dir))
+
+def _parse_into_cache(pdf_path, cache_dir):
+    digest = file_sha256(pdf_path)
+    if os.path.exists(_cache_path(digest, cache_dir)):
+        return pdf_path, True
+    store_cached_pages(pdf_path, iter_pdf_pages(pdf_path), cache_dir, digest)
+    return pdf_path, False
+
+def parse_corpus(directory, cache_dir=CACHE_DIR, max_workers=None):
+    """Parse every PDF in directory across a process pool, storing page text in the cache.
+
+    Returns the sorted list of PDF paths; already-cached documents are not parsed again.
+    """
+    pdf_paths = sorted(glob.glob(os.path.join(directory, "*.pdf")))
+    logging.info(f"Parsing {len(pdf_paths)} PDFs from {directory}")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_parse_into_cache, pdf_path, cache_dir) for pdf_path in pdf_paths]
+        for future in futures:
+            pdf_path, was_cached = future.result()
+            logging.info(f"{'Cached' if was_cached else 'Parsed'}: {pdf_path}")
+    return pdf_paths
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Parse a directory of PDFs into the page text cache")
+    parser.add_argument("directory", nargs="?", default="data")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    parse_corpus(args.directory, max_workers=args.workers)
@@ -0,0 +1,60 @@
+import logging
+import re
+from functools import lru_cache
+
+TERM_CATEGORIES = ("deterioration_mechanisms", "physical_changes", "ndt_methods")
+
+# Chunks mentioning fewer distinct glossary terms than this are not sent to the LLM
+MIN_RELEVANCE = 2
+
+def _alternation(terms):
+    # Longest terms first, so "stress corrosion cracking" wins over "corrosion"
+    escaped = sorted({re.escape(term.lower()) for term in terms}, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(escaped) + ")")
+
+@lru_cache(maxsize=None)
+def _compile(materials):
+    term_pattern = _alternation(term for material in materials for category in TERM_CATEGORIES
+                                for term in material.glossary[category])
+    name_patterns = [(material, _alternation(material.glossary["materials"] + material.aliases)) for material in materials]
+    return term_pattern, name_patterns
+
+class PrefilterStats:
+    def __init__(self):
+        self.chunks = 0
+        self.skipped = 0
+        self.material_tags = {}
+
+    def summary(self):
+        return {"chunks": self.chunks, "skipped": self.skipped, "api_calls_avoided": self.skipped,
+                "material_tags": dict(self.material_tags)}
+
+def score_chunk(chunk, materials):
+    """Return (relevance, tagged_materials) for a chunk.
+
+    relevance is the number of distinct deterioration/physical change/NDT method glossary terms
+    in the chunk. tagged_materials are the materials named in it, most mentioned first; when no
+    material is named all of them are kept, since the chunk alone cannot tell which applies.
+    """
+    term_pattern, name_patterns = _compile(tuple(materials))
+    lowered = chunk.lower()
+    relevance = len(set(term_pattern.findall(lowered)))
+    mentions = [(len(pattern.findall(lowered)), index) for index, (_, pattern) in enumerate(name_patterns)]
+    tagged = [name_patterns[index][0] for count, index in sorted(mentions, key=lambda item: (-item[0], item[1])) if count]
+    return relevance, tagged or list(materials)
+
+def filter_relevant_chunks(chunks, materials, min_relevance=MIN_RELEVANCE, stats=None):
+    """Yield (chunk, tagged_materials) for every chunk scoring at least min_relevance."""
+    stats = PrefilterStats() if stats is None else stats
+    for chunk in chunks:
+        stats.chunks += 1
+        relevance, tagged = score_chunk(chunk, materials)
+        if relevance < min_relevance:
+            stats.skipped += 1
+            logging.info(f"Skipping chunk {stats.chunks}: relevance {relevance} below {min_relevance}")
+            continue
+        for material in tagged:
+            stats.material_tags[material.name] = stats.material_tags.get(material.name, 0) + 1
+        logging.debug(f"Chunk {stats.chunks}: relevance {relevance}, materials {[material.name for material in tagged]}")
+        yield chunk, tagged
+    logging.info(f"Prefilter: {stats.summary()}")
@@ -0,0 +1,68 @@
+import json
+import logging
+from contextlib import contextmanager
+
+def usage_counts(usage):
+    """Return (prompt, completion, cached prompt) tokens from a response's usage block."""
+    if not usage:
+        return 0, 0, 0
+    details = usage.get("prompt_tokens_details") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), details.get("cached_tokens", 0)
+
+class TokenLedger:
+    """Prompt, completion and provider-cached tokens for every LLM request of a run.
+
+    Each request is recorded against the document currently being extracted and the id of its
+    chunk (the chunk digest used by checkpoints and manifests, or a batch custom_id), so totals can
+    be reported per request (chunk), per document and per run, and divided by the tuples kept.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.current_document = None
+
+    @contextmanager
+    def document(self, name):
+        previous, self.current_document = self.current_document, name
+        try:
+            yield
+        finally:
+            self.current_document = previous
+
+    def record(self, usage, cache_hit=False, document=None, chunk=None):
+        prompt, completion, cached = usage_counts(usage)
+        self.requests.append({
+            "document": document or self.current_document,
+            "chunk": chunk,
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "cached_tokens": cached,
+            "cache_hit": cache_hit,
+        })
+
+    @staticmethod
+    def _totals(requests):
+        totals = {"requests": len(requests), "local_cache_hits": sum(request["cache_hit"] for request in requests)}
+        for field in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+            totals[field] = sum(request[field] for request in requests)
+        return totals
+
+    def by_document(self):
+        documents = {}
+        for request in self.requests:
+            documents.setdefault(request["document"], []).append(request)
+        return {document: self._totals(requests) for document, requests in documents.items()}
+
+    def report(self, tuples=None):
+        totals = self._totals(self.requests)
+        if tuples:
+            totals["tuples"] = tuples
+            totals["tokens_per_tuple"] = round((totals["prompt_tokens"] + totals["completion_tokens"]) / tuples, 1)
+        return {"run": totals, "documents": self.by_document(), "chunks": self.requests}
+
+    def write_report(self, path, tuples=None):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(tuples), file, indent=2)
+        logging.info(f"Token report written to {path}")
+
+TOKEN_LEDGER = TokenLedger()
@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import re
+
+from striprtf.striprtf import rtf_to_text
+
+try:
+    import ijson
+except ImportError:  # Fall back to loading the whole JSON document when ijson is not installed
+    ijson = None
+
+# Field names of the structured output printed by the extraction pipeline
+ENTRY_FIELDS = (
+    ("material",),
+    ("deterioration_mechanism", "deterioration_mechanisms", "deterioration"),
+    ("physical_changes", "physical_change"),
+    ("ndt_method", "ndt_methods"),
+)
+
+ESCAPES = re.compile(r"\\[\\{}]")
+
+def _brace_depth(text):
+    text = ESCAPES.sub("", text)
+    return text.count("{") - text.count("}")
+
+def iter_rtf_text_lines(file):
+    """Yield the plain-text lines of an RTF document, reading it one line at a time.
+
+    RTF groups spanning several lines are gathered until their braces balance, so memory is bounded
+    by the longest group rather than the size of the document.
+    """
+    unit = ""
+    text = ""
+    depth = 0
+    started = False
+    for line in file:
+        if not started and line.strip():
+            started = True
+            if line.lstrip().startswith("{"):
+                # Drop the document's own opening brace; everything inside it is document level
+                line = line.lstrip()[1:]
+        depth += _brace_depth(line)
+        if depth < 0:
+            # The closing brace of the document
+            line = line[:line.rfind("}")]
+            depth = 0
+        unit += line
+        if depth == 0:
+            # A source line break is not a text line break in RTF, so text carries over until \par or \\
+            *lines, text = (text + rtf_to_text("{\\rtf1 " + unit + "}")).split('\n')
+            yield from (text_line.strip() for text_line in lines if text_line.strip())
+            unit = ""
+    if text.strip():
+        yield text.strip()
+
+def parse_entry(entry):
+    """Turn a "Material; mechanism; physical change; NDT method" string into a row for the batch query, or None."""
+    parts = entry.split(';')
+    if len(parts) != 4:
+        return None
+    material, deterioration, physical_change, ndt_method = (part.strip() for part in parts)
+    return {"material": material, "deterioration": deterioration, "physical_change": physical_change, "ndt_method": ndt_method}
+
+def entry_from_record(record):
+    """Turn a JSON record (a tuple string, or an object with the four fields) into a tuple string, or None."""
+    if isinstance(record, str):
+        return record
+    if isinstance(record, dict):
+        values = []
+        for names in ENTRY_FIELDS:
+            value = next((record[name] for name in names if name in record), None)
+            if value is None:
+                return None
+            values.append(str(value).strip())
+        return "; ".join(values)
+    return None
+
+def _iter_json_records(file):
+    if ijson is not None:
+        _, first_event, _ = next(ijson.parse(file))
+        file.seek(0)
+        if first_event == "start_map":
+            # A run manifest: the tuples of every document
+            for _, document in ijson.kvitems(file, "documents"):
+                yield from document.get("tuples", [])
+        else:
+            yield from ijson.items(file, "item")
+        return
+    data = json.load(file)
+    if isinstance(data, dict):
+        data = [entry for document in data.get("documents", {}).values() for entry in document.get("tuples", [])]
+    yield from data
+
+def iter_file_entries(path):
+    """Yield the tuple strings of one extraction output file, lazily.
+
+    .json files hold a list of tuple strings or structured records (or are a run manifest), .jsonl
+    files one of those per line; anything else is read as RTF (or plain text) with one tuple per line.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, 'rb' if ijson is not None else 'r') as file:
+            for record in _iter_json_records(file):
+                entry = entry_from_record(record)
+                if entry is not None:
+                    yield entry
+        return
+    with open(path, 'r', encoding='utf-8') as file:
+        if extension == ".jsonl":
+            for line in file:
+                if line.strip():
+                    entry = entry_from_record(json.loads(line))
+                    if entry is not None:
+                        yield entry
+            return
+        first = next((line for line in file if line.strip()), "")
+        file.seek(0)
+        # RTF documents, and RTF fragments without a header (which start with a control word)
+        if first.lstrip().startswith(("{\\rtf", "\\")):
+            yield from iter_rtf_text_lines(file)
+        else:
+            yield from (line.strip() for line in file if line.strip())
+
+def iter_entries(paths):
+    """Yield the tuple strings of all the files in turn; only one file is open at a time."""
+    for path in paths:
+        logging.info(f"Reading tuples from {path}")
+        yield from iter_file_entries(path)
@@ -1,8 +1,11 @@
 import PyPDF2
 import openai
+import argparse
 import logging
 import json
 
+from llm_backend import configure_backend, get_backend
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -90,7 +93,7 @@ Here is the text:
 Ensure each entry is formatted exactly as specified with semicolons separating the fields and numbered entries. Do not include additional labels or descriptors in the output.
 """
 
-    response = openai.ChatCompletion.create(
+    response = get_backend().create(
         model="gpt-4o",  # Using GPT-4
         messages=[
             {"role": "system", "content": "You are a helpful assistant."},
@@ -139,8 +142,14 @@ def post_process_extracted_data(extracted_data):
 if __name__ == "__main__":
     openai.api_key = 'Placeholder_API'
 
-    pdf_path = 'data/bricks/ndt_bricks.pdf'  # Adjust the path to match your file
-    text = extract_text_from_pdf(pdf_path)
+    parser = argparse.ArgumentParser(description="Extract wood deterioration tuples from a PDF")
+    parser.add_argument("pdf_path", nargs="?", default='data/bricks/ndt_bricks.pdf')  # Adjust the path to match your file
+    parser.add_argument("--record", metavar="CASSETTE", help="record every LLM request and response to this JSONL cassette")
+    parser.add_argument("--replay", metavar="CASSETTE", help="answer LLM requests from a recorded cassette instead of the API")
+    args = parser.parse_args()
+    configure_backend(record=args.record, replay=args.replay)
+
+    text = extract_text_from_pdf(args.pdf_path)
 
     print(f"Extracted text length: {len(text)}")
     print("First 500 characters of extracted text:")